@@ -0,0 +1,16 @@
+import pytest
+
+from uttt.arena import run_match
+from uttt.engine import EngineConfig
+
+
+def test_latencies_are_kept_per_side_when_names_match():
+    match = run_match(EngineConfig(iterations=10), EngineConfig(iterations=20), games=2, workers=1)
+    assert set(match['latency']) == {'a', 'b'}
+    assert match['latency']['a']['moves'] + match['latency']['b']['moves'] == sum(
+        record['moves'] - 1 for record in match['game_records'])  # X's opening move isn't searched
+
+
+def test_configs_with_workers_are_rejected_before_the_match():
+    with pytest.raises(ValueError):
+        run_match(EngineConfig(), EngineConfig(workers=2), games=2, workers=1)
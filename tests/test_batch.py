@@ -0,0 +1,15 @@
+from uttt.bitboard import BitBoard
+from uttt.mcts import MCTSNode, seed_search
+
+# The batch backend picks a whole batch of leaves before any of them is scored. Virtual loss has to spread the batch
+# over the root children instead of sending every leaf down the first one.
+
+
+def test_batch_spreads_visits_over_the_root_children():
+    seed_search(0)
+    root = MCTSNode(BitBoard.from_moves([40, 36]))
+    root.best_action(256, backend='batch')
+    visits = sorted((child.num_visits for child in root.children), reverse=True)
+    assert root.num_visits == 256
+    assert visits[0] < 256 // 2
+    assert root.visit_totals_consistent()  # every virtual loss was taken back
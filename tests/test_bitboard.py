@@ -0,0 +1,34 @@
+import random
+
+from uttt.bitboard import BitBoard
+
+# make_move packs what it needs to take a move back onto the undo stack; unmake_move must restore every field, across
+# won and drawn boards and the moves that send play anywhere.
+
+
+def _state(board):
+    return board.cells[:], board.won[:], board.closed, board.active, board.turn, board.winner, board.over, board.ply
+
+
+def test_make_and_unmake_round_trip():
+    rng = random.Random(11)
+    for game in range(200):
+        board = BitBoard()
+        states = []
+        while not board.over:
+            states.append(_state(board))
+            board.make_move(rng.choice(board.legal_moves()))
+        while states:
+            board.unmake_move()
+            assert _state(board) == states.pop()
+
+
+def test_rollout_leaves_the_board_unchanged():
+    rng = random.Random(12)
+    board = BitBoard()
+    for _ in range(20):
+        board.make_move(rng.choice(board.legal_moves()))
+    before = _state(board)
+    for _ in range(50):
+        assert board.rollout() in (-1, 0, 1)
+        assert _state(board) == before
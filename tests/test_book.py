@@ -0,0 +1,12 @@
+from uttt.book import build_book, opening_positions
+from uttt.engine import Engine, EngineConfig
+
+
+def test_book_starts_at_the_empty_board(tmp_path):
+    positions = opening_positions(1)
+    assert positions[0] == [] and len(positions) == 1 + 81
+    path = str(tmp_path / 'book.npy')
+    size, seconds = build_book(plies=0, iterations=50, workers=1, path=path)
+    assert size == 1
+    cell, stats = Engine(EngineConfig(book=path)).search([])
+    assert stats.stop_reason == 'book'
@@ -0,0 +1,43 @@
+import threading
+
+from uttt.bitboard import BitBoard
+from uttt.budget import SearchBudget
+from uttt.mcts import MCTSNode
+from uttt.nodestore import BYTES_PER_NODE
+
+
+def _root():
+    return MCTSNode(BitBoard.from_moves([40, 36]))
+
+
+def test_budget_spent_before_the_first_iteration_still_gives_a_legal_move():
+    stopped = threading.Event()
+    stopped.set()
+    for budget in (SearchBudget(time_ms=0), SearchBudget(nodes=0), SearchBudget(stop_event=stopped)):
+        root = _root()
+        best = root.best_action(budget=budget)
+        assert root.search_info['iterations'] == 0
+        assert best.parent_action in root.bitboard().legal_moves()
+
+
+def test_iteration_budget_runs_exactly():
+    root = _root()
+    root.best_action(budget=SearchBudget(iterations=50))
+    assert root.search_info['iterations'] == 50
+    assert root.num_visits == 50
+
+
+def test_root_and_store_backends_take_a_deadline():
+    for backend, workers in (('root', 2), ('store', 1)):
+        root = _root()
+        root.best_action(budget=SearchBudget(time_ms=50), backend=backend, workers=workers)
+        assert root.search_info['stop_reason'] == 'time'
+        assert root.num_visits == root.search_info['iterations'] > 0
+
+
+def test_store_backend_counts_memory_in_store_nodes():
+    root = _root()
+    root.best_action(budget=SearchBudget(iterations=5000, memory_bytes=100000), backend='store')
+    nodes = 100000 // BYTES_PER_NODE  # thousands of store rows, where MCTSNodes would only fill a few dozen
+    assert root.search_info['stop_reason'] == 'nodes'
+    assert nodes <= root.search_info['iterations'] < nodes + 100
@@ -0,0 +1,33 @@
+import random
+
+from uttt.bitboard import BitBoard
+from uttt.endgame import EndgameSolver
+from uttt.mcts import MCTSNode
+from uttt.transposition import TranspositionTable
+
+
+def _late_position(seed, threshold):  # moves of a random game played until the endgame solver applies
+    rng = random.Random(seed)
+    while True:
+        board = BitBoard()
+        moves = []
+        while not board.over and not EndgameSolver(threshold).applies(board):
+            moves.append(rng.choice(board.legal_moves()))
+            board.make_move(moves[-1])
+        if not board.over:
+            return moves
+
+
+def test_children_found_in_the_table_are_solved_too():
+    moves = _late_position(7, 12)
+    table = TranspositionTable(10000)
+    endgame = EndgameSolver(12)
+    roots = []
+    for _ in range(2):  # the second root finds every child in the table the first one filled
+        root = MCTSNode(BitBoard.from_moves(moves), table=table, endgame=endgame)
+        while root.untried_actions:
+            root.expand()
+        roots.append(root)
+    first, second = ({c.position_key(): c.proven for c in root.children} for root in roots)
+    assert first == second
+    assert None not in second.values()
@@ -0,0 +1,32 @@
+import pytest
+
+from uttt.engine import Engine, EngineConfig
+
+# An EngineConfig whose settings can't search together must fail when it is made, not at the first move of a game, and
+# an Engine that is asked for the position after its own move and the reply continues in the subtree it searched.
+
+
+@pytest.mark.parametrize('kwargs', [{'backend': 'gpu'}, {'iterations': None}, {'backend': 'batch', 'rollout': 'greedy'},
+                                    {'backend': 'serial', 'workers': 4}, {'backend': 'batch', 'workers': 2},
+                                    {'workers': 0}, {'backend': 'tree', 'workers': 0}, {'table_policy': 'fifo'}])
+def test_config_rejects_settings_that_cannot_search(kwargs):
+    with pytest.raises(ValueError):
+        EngineConfig(**kwargs)
+
+
+def test_config_accepts_a_deadline_on_every_backend():
+    for backend in ('root', 'store'):
+        EngineConfig(iterations=None, time_ms=50, backend=backend, workers=2)
+
+
+def test_search_continues_in_the_subtree_of_the_reply():
+    engine = Engine(EngineConfig(iterations=300, seed=1))
+    cell, stats = engine.search([40])
+    old_root, best = engine.tree, engine.best
+    reply = max(best.children, key=lambda child: child.num_visits)
+    kept = reply.num_visits
+    engine.search([40, cell, reply.parent_action])
+    assert engine.tree is reply
+    assert reply.parent is None
+    assert reply.num_visits == kept + 300
+    assert old_root.children == [] and best.children == []  # the branches that can no longer be reached are pruned
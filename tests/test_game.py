@@ -0,0 +1,21 @@
+import builtins
+
+from uttt.game import GameBoard, read_player_move
+
+
+def _answer(monkeypatch, answers):
+    answers = iter(answers)
+    monkeypatch.setattr(builtins, 'input', lambda prompt='': next(answers))
+
+
+def test_player_is_asked_again_until_the_move_is_legal(monkeypatch):
+    main_game = GameBoard(meta_game=True)
+    _answer(monkeypatch, ['ZZ', 'UL', 'MM', 'MM'])  # a typo in the board name, then the centre
+    square = read_player_move(main_game)
+    assert (square.game_board.parent_square.position, square.position) == ('MM', 'MM')
+    curr_pos = square.game_board.move(square)
+    curr_pos.move(main_game.squares['MM'].sub_game.squares['UL'])
+    curr_pos.move(main_game.squares['UL'].sub_game.squares['MM'])  # sends O back to the middle board
+    _answer(monkeypatch, ['MM', 'UL', 'ul', 'BR'])  # only squares are asked for: two taken ones and a typo
+    square = read_player_move(main_game)
+    assert square.position == 'BR' and square.owner is None
@@ -0,0 +1,29 @@
+import random
+
+from uttt.bitboard import BitBoard, cell_for_square, square_for_cell
+from uttt.game import GameBoard, get_legal_moves
+
+# The GameBoard classes play their moves on a BitBoard of their own and show it on their squares. The squares they offer
+# must be the moves of an independent BitBoard in every position, including after a move into a closed board sends play
+# anywhere, and the game they show must end the same way.
+
+
+def test_gameboard_and_bitboard_agree_over_random_games():
+    rng = random.Random(2022)
+    for game in range(300):
+        main_game = GameBoard(meta_game=True)
+        board = BitBoard()
+        curr_pos = None
+        while not board.over:
+            expected = sorted(board.legal_moves())
+            if curr_pos is None:  # before the first move there is no sub-board to ask, every cell is open
+                assert len(expected) == 81
+            else:
+                assert sorted(cell_for_square(square) for square in get_legal_moves(curr_pos)) == expected
+            cell = rng.choice(expected)
+            square = square_for_cell(main_game, cell)
+            curr_pos = (curr_pos or square.game_board).move(square)
+            board.make_move(cell)
+        assert get_legal_moves(curr_pos) == []
+        assert main_game.completed
+        assert main_game.winner == (None if board.winner is None else 'XO'[board.winner])
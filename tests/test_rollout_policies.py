@@ -0,0 +1,29 @@
+import random
+
+from uttt.bitboard import BitBoard
+from uttt.rollout_policies import make_rollout_policy
+
+
+def _choices(name, board, n=200):
+    random.seed(0)
+    policy = make_rollout_policy(name)
+    return {policy.choose(board, board.legal_mask()) for _ in range(n)}
+
+
+def test_policies_take_a_win_before_a_block():
+    board = BitBoard.from_cells(0b000000011, 0b000011000, active=0)  # X can win board UL at 2, O threatens 5
+    for name in ('win', 'block', 'greedy'):
+        assert _choices(name, board) == {2}
+
+
+def test_block_policies_block():
+    board = BitBoard.from_cells(0b100000001, 0b000011000, active=0)  # no win for X, O threatens 5
+    assert _choices('block', board) == {5}
+    assert _choices('greedy', board) == {5}
+    assert len(_choices('win', board)) > 1
+
+
+def test_greedy_avoids_sending_the_opponent_to_a_board_they_can_win():
+    board = BitBoard.from_cells(1 << 8 | 1 << 13, 1 << 45 | 1 << 46, active=0)  # O can win MR, square 5 sends O there
+    assert 5 not in _choices('greedy', board)
+    assert 5 in _choices('block', board)
@@ -0,0 +1,17 @@
+from uttt.bitboard import BitBoard
+from uttt.mcts import MCTSNode
+
+# A fixed seed gives every worker of the 'root' backend its own seed derived from it, so a seeded search must give the
+# same root children and counts on every run.
+
+
+def _root_child_stats(seed):
+    root = MCTSNode(BitBoard.from_moves([40, 36]))
+    root.best_action(400, workers=2, seed=seed)
+    return sorted((child.parent_action, child.num_visits, child.stats.wins, child.stats.draws, child.stats.losses)
+                  for child in root.children)
+
+
+def test_seeded_root_parallel_search_is_repeatable():
+    assert _root_child_stats(5) == _root_child_stats(5)
+    assert _root_child_stats(5) != _root_child_stats(6)
@@ -0,0 +1,28 @@
+from uttt.bitboard import BitBoard
+from uttt.mcts import MCTSNode
+from uttt.nodestore import NodeStore
+from uttt.selection import UCB1
+
+
+class CountingUCB1(UCB1):
+    calls = 0
+
+    def scores(self, visits, values, parent_visits):
+        CountingUCB1.calls += 1
+        return super().scores(visits, values, parent_visits)
+
+
+def test_store_search_uses_the_selection_policy():
+    board = BitBoard()
+    board.make_move(40)
+    NodeStore().search(board, 200, selection=CountingUCB1(c=0.1))
+    assert CountingUCB1.calls > 0
+
+
+def test_root_backend_uses_the_selection_policy():
+    visits = []
+    for c in (0.1, 2.0):
+        root = MCTSNode(BitBoard.from_moves([40, 36]), selection=UCB1(c=c))
+        root.best_action(400, workers=2, seed=3)
+        visits.append(max(child.num_visits for child in root.children))
+    assert visits[0] > 2 * visits[1]  # a wide exploration constant spreads the visits out
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import pytest
+
+from uttt.server import GameServer
+
+# A move request's time_ms comes from the client, so the server must not pass on a search time that is zero, negative,
+# unbounded or not a number at all.
+
+
+def test_move_time_is_clamped():
+    server = GameServer(workers=1, time_ms=200, max_time_ms=5000, min_time_ms=10)
+    try:
+        assert server.move_time({}) == 200
+        assert server.move_time({'time_ms': 0}) == 10
+        assert server.move_time({'time_ms': -50}) == 10
+        assert server.move_time({'time_ms': 1e9}) == 5000
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with pytest.raises(ValueError):
+                server.move_time({'time_ms': value})
+    finally:
+        server.pool.shutdown()
+
+
+def test_non_finite_time_ms_is_a_bad_request():
+    server = GameServer(workers=1)
+
+    async def requests():
+        sessions = {}
+        state = await server.respond(json.dumps({'op': 'new'}), sessions, None)
+        data = '{"op": "move", "session": %d, "move": "MMMM", "time_ms": NaN}' % state['session']
+        return await server.respond(data, sessions, None)
+
+    try:
+        reply = asyncio.run(requests())
+    finally:
+        server.pool.shutdown()
+    assert reply['error'].startswith('bad request')
+    assert server.served == 0
+
+
+def test_json_that_is_not_an_object_is_a_bad_request():
+    server = GameServer(workers=1)
+
+    async def requests():
+        return [await server.respond(data, {}, None) for data in ('[1]', '5', '"x"', 'null')]
+
+    try:
+        replies = asyncio.run(requests())
+    finally:
+        server.pool.shutdown()
+    assert all(reply['error'].startswith('bad request') for reply in replies)
@@ -0,0 +1,32 @@
+import sys
+
+from uttt.bitboard import BitBoard
+from uttt.mcts import MCTSNode, NodeStats
+from uttt.transposition import TranspositionTable
+
+# After X opens in the middle, O's 36 and 37 can come in either order (X answers each in the centre of the board it is
+# sent to), so both move orders reach the same position. The second one reached must share the first one's NodeStats
+# through the table but still play on a board of its own, and the table must only hold those statistics.
+
+
+def _walk(root, cells):
+    node = root
+    for cell in cells:
+        node = node.child_for_cell(cell)
+    return node
+
+
+def test_transposed_positions_share_statistics():
+    table = TranspositionTable(100)
+    root = MCTSNode(BitBoard.from_moves([40]), table=table)
+    first = _walk(root, [36, 4, 37, 13])
+    assert (table.hits, table.misses, len(table)) == (0, 4, 4)
+    second = _walk(root, [37, 13, 36, 4])
+    assert (table.hits, table.misses, len(table)) == (1, 7, 7)
+    assert second.stats is first.stats
+    assert second.bitboard() is not first.bitboard()
+    first.backpropagate(1)
+    assert second.num_visits == 1
+    values = [entry[1] for entry in table.entries.values()]
+    assert all(isinstance(value, NodeStats) for value in values)
+    assert table.report()['memory_bytes'] >= sum(sys.getsizeof(value) for value in values)
@@ -0,0 +1,25 @@
+from uttt.bitboard import BitBoard
+from uttt.budget import SearchBudget
+from uttt.mcts import MCTSNode, tree_parallel_search
+
+# Worker threads share one tree in the 'tree' backend. Every iteration must be counted exactly once on its path, and
+# all virtual loss must be taken back once the search is over.
+
+
+def test_tree_parallel_visit_totals():
+    root = MCTSNode(BitBoard.from_moves([40, 36]))
+    budget = SearchBudget(iterations=400)
+    budget.start(MCTSNode.created)
+    done, reason = tree_parallel_search(root, workers=4, budget=budget)
+    assert (done, reason) == (400, 'iterations')
+    assert root.num_visits == done
+    assert root.visit_totals_consistent()
+
+
+def test_tree_backend_continues_on_a_searched_tree():
+    root = MCTSNode(BitBoard.from_moves([40, 36]))
+    root.best_action(200, workers=4, backend='tree')
+    root.best_action(200, workers=4, backend='tree')
+    assert root.search_info['iterations'] == 200
+    assert root.num_visits == 400
+    assert root.visit_totals_consistent()
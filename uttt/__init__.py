@@ -0,0 +1,21 @@
+import importlib
+
+from .bitboard import ANYWHERE, POSITION_LIST, BitBoard, cell_from_name, cell_name
+from .budget import SearchBudget
+from .game import GameBoard
+from .winlines import DRAW, O, X
+
+# Ultimate Tic-Tac-Toe. The rules core (the BitBoard and the win-line tables, with the GameBoard classes as a view of a
+# BitBoard) is plain Python and is imported with the package. The search needs NumPy, so Engine, EngineConfig, MCTSNode
+# and SearchStats are only imported the first time one of them is used, and a process pool is only started by the
+# first search on several processes.
+#   from uttt import Engine, EngineConfig, SearchBudget
+#   cell, stats = Engine(EngineConfig(endgame=14)).search([40, 36], SearchBudget(time_ms=500))
+
+_LAZY = {'Engine': 'engine', 'EngineConfig': 'engine', 'MCTSNode': 'mcts', 'SearchStats': 'search_stats'}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module('.' + _LAZY[name], __name__), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
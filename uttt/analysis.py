@@ -0,0 +1,111 @@
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+
+from .bitboard import BitBoard, cell_from_name, cell_name
+from .engine import Engine, EngineConfig
+
+# Offline analysis of game archives. A record is one game per line, its moves separated by spaces and named board then
+# square with the UL ... BR position codes, e.g. 'MMUL ULMM MMBR'. Blank lines and lines starting with # are skipped.
+# Records are read lazily from files or stdin and replayed move by move on a BitBoard; every position reached (after
+# the first move, until the game is over) is searched in a process pool. One JSON line per position is written as soon
+# as its search finishes, so results come out of order (each carries its game and ply) and at most max_pending
+# positions are held at a time, however large the archive.
+#   python -m uttt.analysis games.txt --engine iterations=2000,time_ms=500 --workers 4 --out analysis.jsonl
+#   cat games.txt | python -m uttt.analysis - --engine iterations=500
+
+PLAYERS = 'XO'
+
+
+def positions(lines):
+    """ (game, ply, moves) for every position of the records in lines, with moves the cells played so far, or
+    (game, ply, error) when a record has a move that isn't legal there; the rest of that game is skipped """
+    game = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        game += 1
+        board = BitBoard()
+        moves = []
+        for ply, name in enumerate(line.split(), 1):
+            try:
+                cell = cell_from_name(name)
+            except KeyError:
+                cell = None
+            if cell is None or not board.legal_mask() >> cell & 1:
+                yield game, ply, 'illegal move {}'.format(name)
+                break
+            board.make_move(cell)
+            moves.append(cell)
+            if board.over:
+                break
+            yield game, ply, tuple(moves)
+
+
+def analyse_position(job):  # runs in a worker: the search result of one position as a dict
+    game_no, ply, moves, config = job
+    engine = Engine(config)
+    cell, stats = engine.search(list(moves))
+    root, best = engine.tree, engine.best
+    result = {'game': game_no, 'ply': ply, 'to_move': PLAYERS[ply % 2], 'best': cell_name(cell),
+              'value': best.q() / best.num_visits if best.num_visits else 0.0, 'visits': best.num_visits,
+              'proven': root.proven if root.proven is None else -root.proven}  # proven for the player to move
+    result.update(root.search_info)
+    return result
+
+
+def run(lines, out, config, workers=None, max_pending=None):  # streams the positions of lines through the pool
+    max_pending = max_pending or 4 * (workers or os.cpu_count() or 1)  # the pool has os.cpu_count() workers by default
+    written = 0
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        pending = set()
+        for game_no, ply, moves in positions(lines):
+            if isinstance(moves, str):
+                _write(out, {'game': game_no, 'ply': ply, 'error': moves})
+                continue
+            if len(pending) >= max_pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                written += _write_results(out, done)
+            pending.add(pool.submit(analyse_position, (game_no, ply, moves, config)))
+        written += _write_results(out, pending)
+    return written
+
+
+def _write_results(out, futures):
+    for future in futures:
+        _write(out, future.result())
+    return len(futures)
+
+
+def _write(out, record):
+    out.write(json.dumps(record) + '\n')
+    out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Searches every position of recorded games')
+    parser.add_argument('records', nargs='*', default=['-'], help='record files, - for stdin')
+    parser.add_argument('--engine', default='name=analysis,iterations=1000',
+                        help="search settings as for uttt.arena, e.g. 'iterations=2000,time_ms=500,endgame=14'")
+    parser.add_argument('--workers', type=int, default=None, help='processes, defaults to the number of CPUs')
+    parser.add_argument('--max-pending', type=int, default=None, help='positions in flight, 4 per worker by default')
+    parser.add_argument('--out', default='-', help='JSON lines output, - for stdout')
+    args = parser.parse_args()
+    config = EngineConfig.parse(args.engine)
+    out = sys.stdout if args.out == '-' else open(args.out, 'w')
+
+    def lines():
+        for path in args.records:
+            if path == '-':
+                yield from sys.stdin
+            else:
+                with open(path) as f:
+                    yield from f
+    run(lines(), out, config, args.workers, args.max_pending)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from .bitboard import POSITION_LIST, BitBoard
+from .engine import Engine, EngineConfig
+from .mcts import seed_search
+
+# Headless self-play: two engine configurations play each other over many games in a process pool. Games come in pairs
+# that start from the same random opening move with the colors swapped, so neither engine gets the better openings.
+# Engines can differ in any EngineConfig setting (see engine.py): iterations, time budget, exploration constant,
+# selection formula, rollout policy, endgame solver and backend. Configs with workers > 1 are rejected, the arena already
+# runs one game per process.
+# The match is summed up as win/draw/loss counts and an Elo difference with a 95% confidence interval, plus per-move
+# latency percentiles of a and b and games per second, and written to a JSON results file.
+#   python -m uttt.arena --a name=base,iterations=100 --b name=wide,iterations=100,c=0.4 --games 1000 --workers 4
+
+Z_95 = 1.96
+
+
+def play_game(job):
+    """ Plays one game, job is (x_config, o_config, opening cell, seed). Returns the winner ('X', 'O' or None for a
+    draw), the number of moves and the search time in ms of every move of each color. Each color gets its own Engine,
+    which keeps its tree from one move to the next """
+    x_config, o_config, opening, seed = job
+    seed_search(seed)
+    engines = {'X': Engine(x_config), 'O': Engine(o_config)}
+    board = BitBoard()
+    board.make_move(opening)  # X's first move
+    latencies = {'X': [], 'O': []}
+    moves = 1
+    while not board.over:
+        color = 'XO'[board.turn]
+        start = time.perf_counter()
+        cell, stats = engines[color].search(board)
+        latencies[color].append((time.perf_counter() - start) * 1000)
+        board.make_move(cell)
+        moves += 1
+    return None if board.winner is None else 'XO'[board.winner], moves, latencies
+
+
+def elo(wins, draws, losses):
+    """ Elo difference of the first engine and its 95% confidence interval, from the score per game and its
+    standard error. A clean sweep is counted as half a game short of it so the Elo stays finite """
+    games = wins + draws + losses
+    score = min(max((wins + draws / 2) / games, 0.5 / games), 1 - 0.5 / games)
+    deviation = math.sqrt((wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games)
+    margin = Z_95 * deviation / math.sqrt(games)
+    return _score_to_elo(score), (_score_to_elo(score - margin), _score_to_elo(score + margin))
+
+
+def _score_to_elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)  # the interval can reach past 0 and 1
+    return -400 * math.log10(1 / score - 1)
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return None
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {'moves': len(latencies), 'mean_ms': float(np.mean(latencies)), 'p50_ms': float(p50),
+            'p90_ms': float(p90), 'p99_ms': float(p99), 'max_ms': float(np.max(latencies))}
+
+
+def run_match(a, b, games=100, workers=None, seed=0):
+    """ Plays games between EngineConfigs a and b (rounded up to whole color-swapped pairs) and returns the
+    summary, with wins, draws and losses counted for a """
+    for config in (a, b):
+        if config.workers > 1:
+            raise ValueError('{} has workers={}, but the arena runs each game in one process'.format(
+                config.name, config.workers))
+    rng = random.Random(seed)
+    jobs = []
+    for pair in range((games + 1) // 2):
+        opening = rng.randrange(81)
+        jobs.append((a, b, opening, rng.getrandbits(31)))
+        jobs.append((b, a, opening, rng.getrandbits(31)))
+    wins = draws = losses = 0
+    latencies = {'a': [], 'b': []}  # by side, the names of a and b can be the same
+    records = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for job, (winner, moves, times) in zip(jobs, pool.imap(play_game, jobs, chunksize=1)):
+            a_color = 'X' if job[0] is a else 'O'
+            b_color = 'O' if a_color == 'X' else 'X'
+            if winner is None:
+                draws += 1
+            elif winner == a_color:
+                wins += 1
+            else:
+                losses += 1
+            latencies['a'].extend(times[a_color])
+            latencies['b'].extend(times[b_color])
+            records.append({'x': job[0].name, 'o': job[1].name, 'opening': POSITION_LIST[job[2] // 9] + POSITION_LIST[
+                job[2] % 9], 'winner': winner, 'moves': moves})
+    seconds = time.perf_counter() - start
+    played = len(jobs)
+    rating, (low, high) = elo(wins, draws, losses)
+    return {'a': a.to_dict(), 'b': b.to_dict(), 'games': played, 'wins': wins, 'draws': draws, 'losses': losses,
+            'win_rate': wins / played, 'draw_rate': draws / played, 'loss_rate': losses / played,
+            'elo': rating, 'elo_ci95': [low, high], 'games_per_second': played / seconds, 'seconds': seconds,
+            'latency': {name: latency_summary(times) for name, times in latencies.items()}, 'seed': seed,
+            'game_records': records}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Self-play match between engine configurations')
+    parser.add_argument('--a', required=True, help="reference engine, e.g. 'name=base,iterations=100'")
+    parser.add_argument('--b', required=True, action='append', help='challenger, repeat to run several matches')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='processes, defaults to the number of CPUs')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='arena_results.json')
+    args = parser.parse_args()
+    a = EngineConfig.parse(args.a)
+    matches = []
+    for text in args.b:
+        match = run_match(a, EngineConfig.parse(text), args.games, args.workers, args.seed)
+        matches.append(match)
+        low, high = match['elo_ci95']
+        print('{} vs {}: +{} ={} -{}  Elo {:+.0f} [{:+.0f}, {:+.0f}]  {:.2f} games/s'.format(
+            a.name, match['b']['name'], match['wins'], match['draws'], match['losses'], match['elo'], low, high,
+            match['games_per_second']))
+    with open(args.out, 'w') as f:
+        json.dump(matches, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
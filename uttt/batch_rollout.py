@@ -0,0 +1,67 @@
+import numpy as np
+from .bitboard import ANYWHERE, X, O
+from .winlines import WINS
+
+# Vectorized random playouts. A batch of N positions is held as arrays and every game in the batch is advanced by one
+# ply per step, so the Python overhead is paid per ply of the longest game rather than per move of every game.
+#   cells  (N, 81) int8: 0 for an empty cell, 1 for X and 2 for O, cell index = board * 9 + square
+#   macro  (N, 9)  int8: 0 for an open board, 1 or 2 for a board won by X or O, 3 for a drawn board
+#   active (N,)    int:  board the next move must be played in, ANYWHERE (-1) for any open board
+#   turn   (N,)    int:  X (0) or O (1) to move
+
+DRAWN = 3
+WIN_TABLE = np.array(WINS, dtype=bool)  # the 512-entry win-line table, indexed by a 3x3 cell mask
+POWERS = 1 << np.arange(9)  # turns a (..., 9) bool array into 3x3 cell masks
+SQUARE_OFFSETS = np.arange(9)
+
+
+def to_arrays(boards):  # stacks a list of BitBoards into the cells, macro, active and turn arrays
+    n = len(boards)
+    cells = np.zeros((n, 81), dtype=np.int8)
+    macro = np.zeros((n, 9), dtype=np.int8)
+    for i, board in enumerate(boards):
+        for player in (X, O):
+            bits = np.frombuffer(board.cells[player].to_bytes(11, 'little'), dtype=np.uint8)
+            cells[i, np.unpackbits(bits, bitorder='little')[:81].astype(bool)] = player + 1
+            macro[i, [b for b in range(9) if board.won[player] >> b & 1]] = player + 1
+        macro[i, [b for b in range(9) if board.closed >> b & 1 and not macro[i, b]]] = DRAWN
+    active = np.array([board.active for board in boards], dtype=np.int64)
+    turn = np.array([board.turn for board in boards], dtype=np.int64)
+    return cells, macro, active, turn
+
+
+def _meta_result(macro):  # 1 for an O win, -1 for an X win, 0 for a draw or a game still going, and a done flag
+    x_won = WIN_TABLE[(macro == 1) @ POWERS]
+    o_won = WIN_TABLE[(macro == 2) @ POWERS]
+    done = x_won | o_won | (macro != 0).all(axis=1)
+    return o_won.astype(np.int8) - x_won.astype(np.int8), done
+
+
+def batch_rollout(cells, macro, active, turn):
+    """ Plays every position of the batch to the end with uniformly random moves, returns the outcome vector """
+    outcomes, done = _meta_result(macro)
+    live = np.flatnonzero(~done)  # batch rows still being played, the working arrays below hold only these rows
+    c, m, a, t = cells[live], macro[live], active[live], turn[live]
+    while live.size:
+        rows = np.arange(live.size)
+        # legal cells: the empty cells of the active board, or of every open board when it is closed or ANYWHERE
+        open_boards = m == 0
+        forced = (a != ANYWHERE) & open_boards[rows, np.maximum(a, 0)]
+        boards = np.where(forced[:, None], SQUARE_OFFSETS == a[:, None], open_boards)
+        legal = np.repeat(boards, 9, axis=1) & (c == 0)  # never empty: a game ends once every board is closed
+        # masked random choice: the largest of uniform draws over the legal cells is a uniform pick
+        move = np.argmax(np.random.random(legal.shape) * legal, axis=1)
+        mark = (t + 1).astype(np.int8)
+        c[rows, move] = mark
+        board, square = move // 9, move % 9
+        sub = c[rows[:, None], board[:, None] * 9 + SQUARE_OFFSETS]
+        won = WIN_TABLE[(sub == mark[:, None]) @ POWERS]
+        full = (sub != 0).all(axis=1)
+        m[rows, board] = np.where(won, mark, np.where(full, DRAWN, 0))
+        a = np.where(m[rows, square] == 0, square, ANYWHERE)
+        t = t ^ 1
+        result, finished = _meta_result(m)
+        outcomes[live[finished]] = result[finished]
+        keep = ~finished
+        live, c, m, a, t = live[keep], c[keep], m[keep], a[keep], t[keep]
+    return outcomes
@@ -0,0 +1,193 @@
+import argparse
+import copy
+import gc
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from .bitboard import BitBoard
+from .game import get_legal_moves, replay
+from .mcts import MCTSNode
+from .nodestore import NodeStore
+from .winlines import O, X, outcome
+
+# Micro-benchmarks of the hot primitives: legal move generation, making a move, win detection, copying a position, one
+# rollout and a whole best_action search. Every primitive runs on a corpus of seeded mid-game positions and is reported
+# as ns/op and ops/sec. Results are compared against a stored baseline and any primitive slower than the baseline by
+# more than the threshold fails the run.
+#   python -m uttt.bench                   compare with bench_baseline.json
+#   python -m uttt.bench --save-baseline   store this machine's numbers as the new baseline (a run of only some
+#                                          representations or primitives updates just those entries)
+# A state representation is benchmarked through a class with a position() method and one method per primitive, listed
+# in REPRESENTATIONS. Primitives a representation doesn't have are skipped.
+
+PRIMITIVES = ('legal_moves', 'move', 'is_complete', 'copy', 'rollout', 'best_action')
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+SEARCH_ITERATIONS = 50  # iterations of one best_action op
+
+
+def make_corpus(size=16, seed=2024, min_moves=10, max_moves=40):  # move lists (cell indices) of unfinished games
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < size:
+        board = BitBoard()
+        moves = []
+        for _ in range(rng.randint(min_moves, max_moves)):
+            cell = rng.choice(board.legal_moves())
+            board.make_move(cell)
+            moves.append(cell)
+            if board.over:
+                break
+        if not board.over:
+            corpus.append(moves)
+    return corpus
+
+
+class GameBoardBench:  # the GameBoard classes of game.py, the interactive game's view of a BitBoard
+    def position(self, moves):  # (main_game, curr_pos) after playing moves
+        return replay(moves)
+
+    def legal_moves(self, position, repeat):
+        return [lambda: get_legal_moves(position[1])] * repeat
+
+    def move(self, position, repeat):  # each op plays the first legal move on its own copy, made outside the timing
+        ops = []
+        for _ in range(repeat):
+            curr_pos = copy.deepcopy(position[1])
+            square = get_legal_moves(curr_pos)[0]
+            ops.append(lambda curr_pos=curr_pos, square=square: curr_pos.move(square))
+        return ops
+
+    def is_complete(self, position, repeat):
+        return [position[0].is_complete] * repeat
+
+    def copy(self, position, repeat):
+        return [lambda: copy.deepcopy(position[1])] * repeat
+
+    # no rollout or best_action: the search runs on BitBoards, which the bitboard cases time
+
+
+class BitBoardBench:  # the BitBoard of bitboard.py, searched with the engine's MCTSNode tree
+    def position(self, moves):
+        return BitBoard.from_moves(moves)
+
+    def legal_moves(self, board, repeat):
+        return [board.legal_moves] * repeat
+
+    def move(self, board, repeat):  # make and unmake, so the op leaves the board as it was
+        cell = board.legal_moves()[0]
+
+        def op():
+            board.make_move(cell)
+            board.unmake_move()
+        return [op] * repeat
+
+    def is_complete(self, board, repeat):  # the meta-board win check from the won and closed masks
+        won, closed = board.won, board.closed
+        return [lambda: outcome(won[X], won[O], closed)] * repeat
+
+    def copy(self, board, repeat):
+        return [board.copy] * repeat
+
+    def rollout(self, board, repeat):
+        return [board.rollout] * repeat
+
+    def best_action(self, board, repeat):
+        return [lambda: MCTSNode(board).best_action(SEARCH_ITERATIONS)] * repeat
+
+
+class NodeStoreBench:  # the same BitBoard searched in the arrays of a NodeStore
+    def position(self, moves):
+        return BitBoard.from_moves(moves)
+
+    def best_action(self, board, repeat):
+        return [lambda: NodeStore().search(board, SEARCH_ITERATIONS)] * repeat
+
+
+REPRESENTATIONS = {'gameboard': GameBoardBench, 'bitboard': BitBoardBench, 'nodestore': NodeStoreBench}
+REPEATS = {'legal_moves': 200, 'move': 100, 'is_complete': 500, 'copy': 10, 'rollout': 20, 'best_action': 1}
+
+
+def time_ops(ops, rounds=5, warmup=True):  # best ns/op over rounds, after one untimed op
+    if warmup:
+        ops[0]()
+    best = None
+    gc.disable()  # like timeit, so a collection doesn't land in one primitive's numbers
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter_ns()
+            for op in ops:
+                op()
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best / len(ops)
+
+
+def run(representations=None, primitives=PRIMITIVES, corpus=None, scale=1.0, seed=0):
+    """ {'representation.primitive': ns/op}, each primitive averaged over the corpus positions """
+    corpus = corpus if corpus is not None else make_corpus()
+    results = {}
+    for name in representations or REPRESENTATIONS:
+        bench = REPRESENTATIONS[name]()
+        positions = [bench.position(moves) for moves in corpus]
+        for primitive in primitives:
+            case = getattr(bench, primitive, None)
+            if case is None:
+                continue
+            repeat = max(1, int(REPEATS[primitive] * scale))
+            random.seed(seed)
+            np.random.seed(seed)
+            times = []
+            for position in positions:
+                if primitive == 'move':  # the ops play on copies made here and can only run once
+                    times.append(time_ops(case(position, repeat), rounds=1, warmup=False))
+                else:
+                    times.append(time_ops(case(position, repeat)))
+            results['{}.{}'.format(name, primitive)] = float(np.mean(times))
+    return results
+
+
+def compare(results, baseline, threshold):  # names of the primitives more than threshold slower than the baseline
+    return [name for name, ns in results.items() if name in baseline and ns > baseline[name] * (1 + threshold)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the engine primitives')
+    parser.add_argument('--representation', action='append', choices=tuple(REPRESENTATIONS))
+    parser.add_argument('--primitive', action='append', choices=PRIMITIVES)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies the ops per position')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown, 0.2 is 20%%')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+    results = run(args.representation, args.primitive or PRIMITIVES, scale=args.scale)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    for name, ns in results.items():
+        change = ' {:+6.1f}%'.format((ns / baseline[name] - 1) * 100) if name in baseline else ''
+        print('{:24} {:14.0f} ns/op {:14.1f} ops/sec{}'.format(name, ns, 1e9 / ns, change))
+    if args.save_baseline:
+        if args.representation or args.primitive:
+            baseline.update(results)
+        else:  # a full run replaces the baseline, so every entry comes from the same machine and run
+            baseline = results
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        return
+    slower = compare(results, baseline, args.threshold)
+    if slower:
+        print('REGRESSION: {} slower than the baseline by more than {:.0%}'.format(', '.join(slower),
+                                                                                    args.threshold))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
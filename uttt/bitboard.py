@@ -0,0 +1,208 @@
+import random
+from .winlines import DRAW, FULL_BOARD, O, WINS, X, outcome
+
+# Compact game state for Ultimate Tic-Tac-Toe. Cells are numbered board * 9 + square, where both board and square
+# follow the POSITION_LIST order (UL, UM, UR, ML, MM, MR, BL, BM, BR). Each player owns one 81-bit mask of cells and one
+# 9-bit mask of won boards, and every closed (won or drawn) board is also set in a shared 9-bit macro mask.
+
+POSITION_LIST = ['UL', 'UM', 'UR',
+                 'ML', 'MM', 'MR',
+                 'BL', 'BM', 'BR']
+POSITION_INDEX = {name: i for i, name in enumerate(POSITION_LIST)}
+SYMBOLS = ('X', 'O')
+ANYWHERE = -1  # active board index when the player may move in any open board
+
+BOARD_CELLS = tuple(FULL_BOARD << (9 * b) for b in range(9))  # 81-bit mask of each sub-board's cells
+
+
+OPEN_BOARDS = tuple(tuple(b for b in range(9) if not closed >> b & 1) for closed in range(512))
+OPEN_CELLS = tuple(sum(BOARD_CELLS[b] for b in boards) for boards in OPEN_BOARDS)
+
+
+def _move_boards(active, closed):  # boards a move may be played in, the active one unless it is closed
+    if active != ANYWHERE and not closed >> active & 1:
+        return (active,)
+    return OPEN_BOARDS[closed]
+
+
+def _move_cells(active, closed):
+    if active != ANYWHERE and not closed >> active & 1:
+        return BOARD_CELLS[active]
+    return OPEN_CELLS[closed]
+
+
+# MOVE_BOARDS[(active + 1) << 9 | closed] holds the boards open for the next move, and MOVE_CELLS the same set as an
+# 81-bit cell mask, so move generation never has to look at the boards themselves. Both are built from the 512 sets of
+# open boards, which keeps importing the module cheap
+MOVE_BOARDS = tuple(_move_boards((key >> 9) - 1, key & FULL_BOARD) for key in range(10 << 9))
+MOVE_CELLS = tuple(_move_cells((key >> 9) - 1, key & FULL_BOARD) for key in range(10 << 9))
+
+
+def random_cell(mask):  # a uniformly random set bit of mask, a random move when mask holds the legal cells
+    for _ in range(int(random.random() * mask.bit_count())):
+        mask &= mask - 1  # drops the lowest set bit until the chosen one is the lowest
+    return (mask & -mask).bit_length() - 1
+
+
+class BitBoard:
+    def __init__(self):
+        self.cells = [0, 0]  # 81-bit masks of the cells owned by X and O
+        self.won = [0, 0]  # 9-bit masks of the boards won by X and O
+        self.closed = 0  # 9-bit mask of the boards that are won or drawn
+        self.active = ANYWHERE  # board the next move must be played in
+        self.turn = X
+        self.winner = None  # X or O once the meta game is won
+        self.over = False
+        self.ply = 0
+        self._undo = [0] * 81  # preallocated undo stack, one entry per move played
+        self.rollout_plies = 0
+
+    def copy(self):
+        board = BitBoard()
+        board.cells = self.cells[:]
+        board.won = self.won[:]
+        board.closed = self.closed
+        board.active = self.active
+        board.turn = self.turn
+        board.winner = self.winner
+        board.over = self.over
+        board.ply = self.ply
+        board._undo = self._undo[:]
+        return board
+
+    def legal_mask(self):  # 81-bit mask of the cells the side to move may play
+        if self.over:
+            return 0
+        free = ~(self.cells[X] | self.cells[O])
+        return free & MOVE_CELLS[(self.active + 1) << 9 | self.closed]
+
+    def legal_moves(self):
+        moves = []
+        mask = self.legal_mask()
+        while mask:
+            low = mask & -mask
+            moves.append(low.bit_length() - 1)
+            mask ^= low
+        return moves
+
+    def make_move(self, cell):  # plays cell for the side to move, no legality check
+        player = self.turn
+        board, square = divmod(cell, 9)
+        closed_flag = 0
+        self.cells[player] |= 1 << cell
+        mine = (self.cells[player] >> (9 * board)) & FULL_BOARD
+        if WINS[mine]:
+            self.won[player] |= 1 << board
+            self.closed |= 1 << board
+            closed_flag = 2048
+            if WINS[self.won[player]]:
+                self.winner = player
+                self.over = True
+        elif mine | (self.cells[1 - player] >> (9 * board)) & FULL_BOARD == FULL_BOARD:
+            self.closed |= 1 << board  # drawn board
+            closed_flag = 2048
+        if self.closed == FULL_BOARD:
+            self.over = True
+        self._undo[self.ply] = cell | (self.active + 1) << 7 | closed_flag
+        self.ply += 1
+        self.active = ANYWHERE if self.closed >> square & 1 else square
+        self.turn = 1 - player
+
+    def unmake_move(self):  # takes back the last move played
+        self.ply -= 1
+        undo = self._undo[self.ply]  # packed as cell | (previous active + 1) << 7 | closed flag << 11
+        cell = undo & 127
+        player = 1 - self.turn
+        if undo & 2048:
+            bit = 1 << (cell // 9)
+            self.won[player] &= ~bit
+            self.closed &= ~bit
+        self.cells[player] &= ~(1 << cell)
+        self.active = (undo >> 7 & 15) - 1
+        self.turn = player
+        self.winner = None
+        self.over = False
+
+    def result(self):  # 1 if O (the algorithm) won, -1 if X won, 0 for a draw or unfinished game
+        if self.winner == O:
+            return 1
+        elif self.winner == X:
+            return -1
+        return 0
+
+    def rollout(self, policy=None):
+        """ Plays the game to the end, then unmakes every move so the state is unchanged. Moves are uniformly random,
+        or picked by policy (see rollout_policies.py) """
+        start = self.ply  # moves are only recorded on the preallocated undo stack, nothing is allocated per move
+        while not self.over:
+            mask = self.legal_mask()
+            if not mask:
+                break
+            self.make_move(random_cell(mask) if policy is None else policy.choose(self, mask))
+        outcome = self.result()
+        self.rollout_plies = self.ply - start  # length of the last rollout, for search statistics
+        while self.ply > start:
+            self.unmake_move()
+        return outcome
+
+    @classmethod
+    def from_moves(cls, moves):  # the position after moves (cells from the start), ValueError for an illegal one
+        board = cls()
+        for cell in moves:
+            if not board.legal_mask() >> cell & 1:
+                raise ValueError('Illegal move {}'.format(cell_name(cell)))
+            board.make_move(cell)
+        return board
+
+    @classmethod
+    def from_game_board(cls, game_board):  # a copy of the BitBoard behind any GameBoard of a meta game
+        meta = game_board if game_board.meta_game else game_board.parent_square.game_board
+        return meta.bits.copy()
+
+    @classmethod
+    def from_cells(cls, x_cells, o_cells, active=ANYWHERE):
+        """ Builds a BitBoard from the 81-bit cell masks of X and O and the board the next move goes to, working out
+        the won and drawn boards. For state models that don't keep the move order """
+        board = cls()
+        board.cells = [x_cells, o_cells]
+        for b in range(9):
+            result = outcome(x_cells >> (9 * b) & FULL_BOARD, o_cells >> (9 * b) & FULL_BOARD)
+            if result is not None:
+                board.closed |= 1 << b
+                if result != DRAW:
+                    board.won[result] |= 1 << b
+        if active != ANYWHERE and not board.closed >> active & 1:
+            board.active = active
+        board.turn = X if x_cells.bit_count() == o_cells.bit_count() else O
+        board.ply = x_cells.bit_count() + o_cells.bit_count()
+        for player in (X, O):
+            if WINS[board.won[player]]:
+                board.winner = player
+                board.over = True
+        if board.closed == FULL_BOARD:
+            board.over = True
+        return board
+
+    def to_game_board(self, game_board_class):  # builds a new meta GameBoard (pass the GameBoard class in)
+        meta = game_board_class(meta_game=True)
+        meta.bits = self.copy()
+        meta.show()
+        return meta
+
+
+def cell_for_square(square):  # cell index of a GameSquare that sits inside a sub-board
+    board_name = square.game_board.parent_square.position
+    return 9 * POSITION_INDEX[board_name] + POSITION_INDEX[square.position]
+
+
+def cell_name(cell):  # board and square names of a cell, like 'MMUL' for the upper left square of the middle board
+    return POSITION_LIST[cell // 9] + POSITION_LIST[cell % 9]
+
+
+def cell_from_name(name):  # the cell of a name like 'MMUL', raises KeyError for a name that isn't one
+    return 9 * POSITION_INDEX[name[:2]] + POSITION_INDEX[name[2:]]
+
+
+def square_for_cell(meta_game, cell):  # the GameSquare of meta_game matching a cell index
+    board, square = divmod(cell, 9)
+    return meta_game.squares[POSITION_LIST[board]].sub_game.squares[POSITION_LIST[square]]
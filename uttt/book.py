@@ -0,0 +1,90 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from .bitboard import BitBoard
+from .mcts import MCTSNode, seed_search
+from .transposition import zobrist_hash
+
+# Opening book. An offline job searches every position of the opening tree up to a given ply deeply and stores the
+# chosen move with its root statistics in a table sorted by Zobrist hash, saved as a .npy file. At runtime the table is
+# memory-mapped, so opening the book reads nothing up front and a lookup is a binary search over the keys. Positions
+# that aren't in the book are searched as usual.
+#   python -m uttt.book --plies 2 --iterations 5000 --workers 4 --out opening_book.npy
+
+ENTRY = np.dtype([('key', np.uint64), ('move', np.int8), ('ply', np.uint8), ('visits', np.uint32),
+                  ('move_visits', np.uint32), ('value', np.float32)])  # value: mean result for the player moving
+DEFAULT_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.npy')
+
+
+class OpeningBook:
+    def __init__(self, path=DEFAULT_BOOK):
+        self.table = np.load(path, mmap_mode='r')
+        self.keys = self.table['key']
+
+    def __len__(self):
+        return len(self.table)
+
+    def lookup(self, key):  # the entry (a numpy record) for a position hash, or None when it isn't in the book
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index < len(self.keys) and self.keys[index] == key:
+            return self.table[index]
+        return None
+
+
+def opening_positions(plies):  # move lists (cells) of every unfinished position with 0 to plies moves played
+    frontier = [[]]  # the empty board, for an engine that plays X from the start
+    positions = list(frontier)
+    for ply in range(plies):
+        next_frontier = []
+        for moves in frontier:
+            board = BitBoard.from_moves(moves)
+            for cell in board.legal_moves():
+                board.make_move(cell)
+                if not board.over:
+                    next_frontier.append(moves + [cell])
+                board.unmake_move()
+        positions.extend(next_frontier)
+        frontier = next_frontier
+    return positions
+
+
+def _search_position(job):  # one deep search, returns the book entry as a tuple
+    moves, iterations, seed = job
+    seed_search(seed)
+    root = MCTSNode(BitBoard.from_moves(moves))
+    best = root.best_action(iterations)
+    return (zobrist_hash(root.bitboard()), best.parent_action, len(moves), root.num_visits,
+            best.num_visits, best.q() / best.num_visits if best.num_visits else 0.0)
+
+
+def build_book(plies=2, iterations=5000, workers=None, seed=0, path=DEFAULT_BOOK):
+    """ Searches every position up to plies moves deep with iterations each and saves the book to path """
+    positions = opening_positions(plies)
+    jobs = [(moves, iterations, seed + i) for i, moves in enumerate(positions)]
+    start = time.perf_counter()
+    import multiprocessing  # the engine loads this module for OpeningBook, it only needs a pool when building
+    with multiprocessing.Pool(workers) as pool:
+        entries = pool.map(_search_position, jobs, chunksize=4)
+    table = np.array(entries, dtype=ENTRY)
+    table.sort(order='key')
+    np.save(path, table)
+    return len(table), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Builds the opening book')
+    parser.add_argument('--plies', type=int, default=2, help='deepest position in the book, in moves played')
+    parser.add_argument('--iterations', type=int, default=5000, help='search iterations per position')
+    parser.add_argument('--workers', type=int, default=None, help='processes, defaults to the number of CPUs')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=DEFAULT_BOOK)
+    args = parser.parse_args()
+    size, seconds = build_book(args.plies, args.iterations, args.workers, args.seed, args.out)
+    print('{} positions in {:.1f} s, {} bytes'.format(size, seconds, size * ENTRY.itemsize))
+
+
+if __name__ == '__main__':
+    main()
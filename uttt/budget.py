@@ -0,0 +1,76 @@
+import time
+
+# Search budgets for anytime search. A budget can limit iterations, wall-clock time, new tree nodes or (through an
+# estimated size per node) memory, and can stop early once the most visited root child can no longer be overtaken.
+# The search loop asks check() before every iteration (or batch); only the iteration count is compared every time, the
+# rest is looked at once per check_every iterations so the check stays cheap.
+
+# Size of an MCTSNode with its BitBoard and child statistics arrays, used for memory budgets. Measured with tracemalloc
+# as the memory still allocated after best_action(300) (after gc.collect()) divided by the nodes it created, from the
+# positions after one, two and eight moves: 3.6 to 3.9 KB each
+MCTS_NODE_BYTES = 4000
+
+
+class SearchBudget:
+    def __init__(self, iterations=None, time_ms=None, nodes=None, memory_bytes=None, node_bytes=MCTS_NODE_BYTES,
+                 early_stop=False, stop_event=None, check_every=8):
+        self.iterations = iterations
+        self.time_ms = time_ms
+        self.max_nodes = nodes
+        self.memory_bytes = memory_bytes
+        self.use_node_bytes(node_bytes)  # sets nodes, the limit on new nodes that check() compares against
+        self.early_stop = early_stop
+        self.stop_event = stop_event  # a threading.Event, set it to get the current best move right away
+        self.check_every = check_every
+        self.deadline = None
+        self.start_time = None
+        self.start_nodes = 0
+        self.next_check = 0
+
+    def use_node_bytes(self, node_bytes):  # counts memory_bytes in nodes of node_bytes each, for trees of other nodes
+        self.nodes = self.max_nodes
+        if self.memory_bytes is not None:
+            memory_nodes = self.memory_bytes // node_bytes
+            self.nodes = memory_nodes if self.max_nodes is None else min(self.max_nodes, memory_nodes)
+
+    def start(self, node_count=0):
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + self.time_ms / 1000 if self.time_ms is not None else None
+        self.start_nodes = node_count
+        self.next_check = 0
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start_time) * 1000
+
+    def check(self, done, node_count=0, top_two_visits=None):
+        """ Returns why the search should stop ('iterations', 'time', 'nodes', 'decided' or 'stopped'), or None to
+        keep going. top_two_visits is called for early stopping and returns the two highest root child visits """
+        if self.iterations is not None and done >= self.iterations:
+            return 'iterations'
+        if done < self.next_check:
+            return None
+        self.next_check = done + self.check_every
+        if self.stop_event is not None and self.stop_event.is_set():
+            return 'stopped'
+        now = time.perf_counter()
+        if self.deadline is not None and now >= self.deadline:
+            return 'time'
+        if self.nodes is not None and node_count - self.start_nodes >= self.nodes:
+            return 'nodes'
+        if self.early_stop and top_two_visits is not None and done:
+            remaining = self.remaining_iterations(done, now)
+            if remaining is not None:
+                first, second = top_two_visits()
+                if first - second > remaining:
+                    return 'decided'
+        return None
+
+    def remaining_iterations(self, done, now):  # at most how many more iterations can run, None if unbounded
+        remaining = None
+        if self.iterations is not None:
+            remaining = self.iterations - done
+        if self.deadline is not None:
+            rate = done / max(now - self.start_time, 1e-9)
+            by_time = int((self.deadline - now) * rate)
+            remaining = by_time if remaining is None else min(remaining, by_time)
+        return remaining
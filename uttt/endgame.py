@@ -0,0 +1,98 @@
+from .bitboard import OPEN_CELLS
+from .transposition import ACTIVE_KEYS, CELL_KEYS, TURN_KEY, zobrist_hash
+from .winlines import FULL_BOARD, WINNING_SQUARES, X, O
+
+# Exact endgame search. Once few cells are left to play, a BitBoard position is solved with negamax alpha-beta over the
+# values 1 (the side to move wins), 0 (draw) and -1 (the side to move loses). Positions are cached by Zobrist hash with
+# the kind of bound they proved, and a search that visits more than max_nodes positions gives up (returns None) so a
+# position that is still too big never stalls the engine.
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _OutOfNodes(Exception):
+    pass
+
+
+class EndgameSolver:
+    def __init__(self, threshold=12, max_nodes=20000, cache_size=500000):
+        """ Solves positions with at most threshold empty cells left in open boards """
+        self.threshold = threshold
+        self.max_nodes = max_nodes
+        self.cache_size = cache_size
+        self.cache = {}  # hash -> (value, EXACT, LOWER or UPPER)
+        self.nodes = 0
+        self.solved = 0  # positions solved and given up on, for reports
+        self.gave_up = 0
+
+    @staticmethod
+    def open_cells(board):  # empty cells that can still be played
+        return (OPEN_CELLS[board.closed] & ~(board.cells[X] | board.cells[O])).bit_count()
+
+    def applies(self, board):
+        return not board.over and self.open_cells(board) <= self.threshold
+
+    def solve(self, board):  # value of board for the side to move, or None if it is too big or has too many cells left
+        if not self.applies(board):
+            return None
+        self.nodes = 0
+        try:
+            value = self._negamax(board.copy(), zobrist_hash(board), -1, 1)
+        except _OutOfNodes:
+            self.gave_up += 1
+            return None
+        self.solved += 1
+        return value
+
+    def _negamax(self, board, key, alpha, beta):
+        if board.over:  # the last move won the game for the other side, or filled the last open board
+            return -1 if board.winner is not None else 0
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, bound = entry
+            if bound == EXACT:
+                return value
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _OutOfNodes()
+        start_alpha = alpha
+        best = -2
+        player, active = board.turn, board.active
+        for cell in self._ordered_moves(board):
+            board.make_move(cell)
+            child_key = key ^ CELL_KEYS[player][cell] ^ ACTIVE_KEYS[active + 1] ^ ACTIVE_KEYS[board.active + 1] ^ TURN_KEY
+            value = -self._negamax(board, child_key, -beta, -alpha)
+            board.unmake_move()
+            if value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[key] = (best, EXACT if start_alpha < best < beta else LOWER if best >= beta else UPPER)
+        return best
+
+    @staticmethod
+    def _ordered_moves(board):  # cells that win their board first, so cutoffs come early
+        mask = board.legal_mask()
+        mine = board.cells[board.turn]
+        first = 0
+        for b in range(9):
+            free = mask >> (9 * b) & FULL_BOARD
+            if free:
+                first |= (WINNING_SQUARES[mine >> (9 * b) & FULL_BOARD] & free) << (9 * b)
+        moves = []
+        for part in (first, mask & ~first):
+            while part:
+                low = part & -part
+                moves.append(low.bit_length() - 1)
+                part ^= low
+        return moves
@@ -0,0 +1,165 @@
+from .bitboard import BitBoard
+from .book import OpeningBook
+from .budget import SearchBudget
+from .endgame import EndgameSolver
+from .game import GameBoard
+from .mcts import SEARCH_BACKENDS, MCTSNode, Ponder
+from .rollout_policies import ROLLOUT_POLICIES, make_rollout_policy
+from .search_stats import SearchStats
+from .selection import PUCT, UCB1
+from .transposition import TranspositionTable
+
+# The engine API: an EngineConfig says how to search, and Engine(config).search(position, budget) returns the move to
+# play (a cell index) and the SearchStats of the search. A position is a BitBoard, any GameBoard of a game or the list
+# of cells played from the start, so every front end and tool searches the same way whatever state it keeps.
+#   engine = Engine(EngineConfig(iterations=2000, endgame=14))
+#   cell, stats = engine.search([40, 36], SearchBudget(time_ms=500, early_stop=True))
+
+SELECTIONS = {'ucb1': UCB1, 'puct': PUCT}
+
+
+class EngineConfig:
+    FIELDS = {'name': str, 'iterations': int, 'time_ms': float, 'c': float, 'selection': str, 'backend': str,
+              'batch_size': int, 'rollout': str, 'epsilon': float, 'endgame': int, 'workers': int, 'seed': int,
+              'table_size': int, 'table_policy': str, 'book': str}
+
+    def __init__(self, name='engine', iterations=100, time_ms=None, c=0.1, selection='ucb1', backend=None,
+                 batch_size=256, rollout='random', epsilon=0.0, endgame=0, workers=1, seed=None, table_size=0,
+                 table_policy='lru', book=None):
+        """ How one engine searches: iterations and/or time_ms per move, the exploration constant c of the selection
+        formula ('ucb1' or 'puct'), the rollout policy (see rollout_policies.make_rollout_policy), the open cells
+        left when the endgame solver takes over (0 for none), the search backend with its workers and seed (see
+        MCTSNode.best_action), the transposition table entries (0 for none) and the path of an opening book.
+        Settings that can't search together raise ValueError here rather than at the first move """
+        if selection not in SELECTIONS:
+            raise ValueError('Unknown selection {}, use one of {}'.format(selection, tuple(SELECTIONS)))
+        if rollout not in ROLLOUT_POLICIES:
+            raise ValueError('Unknown rollout policy {}, use one of {}'.format(rollout, ROLLOUT_POLICIES))
+        if backend is not None and backend not in SEARCH_BACKENDS:
+            raise ValueError('Unknown search backend {}, use one of {}'.format(backend, SEARCH_BACKENDS))
+        if iterations is None and time_ms is None:
+            raise ValueError('An engine needs iterations or time_ms, or its searches never stop')
+        if backend == 'batch' and rollout != 'random':
+            raise ValueError('The batch backend only plays uniformly random rollouts')
+        if workers < 1:
+            raise ValueError('An engine needs at least one worker, not {}'.format(workers))
+        if backend in ('serial', 'batch') and workers != 1:
+            raise ValueError('The {} backend runs in one thread, use workers=1'.format(backend))
+        if table_policy not in TranspositionTable.POLICIES:
+            raise ValueError('Unknown table policy {}, use one of {}'.format(table_policy, TranspositionTable.POLICIES))
+        self.name = name
+        self.iterations = iterations
+        self.time_ms = time_ms
+        self.c = c
+        self.selection = selection
+        self.backend = backend
+        self.batch_size = batch_size
+        self.rollout = rollout
+        self.epsilon = epsilon
+        self.endgame = endgame
+        self.workers = workers
+        self.seed = seed
+        self.table_size = table_size
+        self.table_policy = table_policy
+        self.book = book
+
+    @classmethod
+    def parse(cls, text):  # 'name=wide,iterations=200,c=0.4' as given on the command line
+        kwargs = {}
+        for item in text.split(','):
+            key, value = item.split('=', 1)
+            if key not in cls.FIELDS:
+                raise ValueError('Unknown engine setting {}, use one of {}'.format(key, tuple(cls.FIELDS)))
+            kwargs[key] = cls.FIELDS[key](value)
+        return cls(**kwargs)
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in EngineConfig.FIELDS}
+
+    def budget(self):  # the SearchBudget of one move when time_ms is set, None to run the iterations
+        if self.time_ms is None:
+            return None
+        return SearchBudget(iterations=self.iterations, time_ms=self.time_ms)
+
+
+def to_bitboard(position):  # position as a BitBoard, from a BitBoard, a GameBoard or a list of the cells played
+    if isinstance(position, BitBoard):
+        return position
+    if isinstance(position, GameBoard):
+        return BitBoard.from_game_board(position)
+    return BitBoard.from_moves(position)
+
+
+def _same_position(a, b):  # the side to move follows from the cells
+    return a.cells == b.cells and a.active == b.active
+
+
+class Engine:
+    def __init__(self, config=None):
+        """ Searches with the settings of config (an EngineConfig, the defaults if None). The transposition table,
+        the endgame solver's cache, the opening book and the last search tree are kept between searches, so a game
+        played through one Engine builds on the work of its earlier moves """
+        self.config = config if config is not None else EngineConfig()
+        self.selection = SELECTIONS[self.config.selection](c=self.config.c)
+        self.rollout_policy = make_rollout_policy(self.config.rollout, self.config.epsilon)
+        self.table = None
+        if self.config.table_size:
+            self.table = TranspositionTable(self.config.table_size, self.config.table_policy)
+        self.endgame = EndgameSolver(self.config.endgame) if self.config.endgame else None
+        self.book = OpeningBook(self.config.book) if self.config.book else None
+        self.tree = None  # root of the last search
+        self.best = None  # the child of tree that the last search picked
+        self.pondering = None
+
+    def search(self, position, budget=None):
+        """ Returns the cell to play in position and the SearchStats of the search. budget is a SearchBudget, by
+        default the config's iterations and time_ms. A position one or two moves on from the last one searched
+        continues in that tree """
+        board = to_bitboard(position)
+        if board.over:
+            raise ValueError('The game is over')
+        self.stop_pondering()
+        root = self.root_for(board)
+        if budget is None:
+            budget = self.config.budget()
+        stats = SearchStats()
+        best = root.best_action(self.config.iterations, workers=self.config.workers, seed=self.config.seed,
+                                backend=self.config.backend, batch_size=self.config.batch_size, budget=budget,
+                                stats=stats)
+        self.tree, self.best = root, best
+        return best.parent_action, stats
+
+    def root_for(self, board):  # the node of board in the last tree (its root, a child or a grandchild), or a new root
+        if self.tree is not None:
+            known = self.tree.bitboard()
+            added = [board.cells[p] & ~known.cells[p] for p in (0, 1)]
+            kept = all(board.cells[p] & known.cells[p] == known.cells[p] for p in (0, 1))
+            if kept and (added[0] | added[1]).bit_count() <= 2:
+                node = self.tree
+                for cell in _cells_in_order(added, known.turn):
+                    node = node.advance(cell)
+                    if node is None:
+                        break
+                if node is not None and _same_position(node.bitboard(), board):
+                    return node
+        return MCTSNode(board, table=self.table, selection=self.selection, rollout_policy=self.rollout_policy,
+                        endgame=self.endgame, book=self.book)  # a copy, board may be the caller's
+
+    def ponder(self, memory_bytes=None):  # keeps searching after the last move picked while the opponent thinks
+        self.stop_pondering()
+        if self.best is not None and not self.best.is_terminal_node():
+            self.pondering = Ponder(self.best, memory_bytes)
+
+    def stop_pondering(self):
+        if self.pondering is not None:
+            self.pondering.stop()
+            self.pondering = None
+
+
+def _cells_in_order(added, turn):  # the new cells of each player, starting with the player to move in the old tree
+    cells = []
+    for player in (turn, 1 - turn):
+        mask = added[player]
+        if mask:
+            cells.append((mask & -mask).bit_length() - 1)
+    return cells
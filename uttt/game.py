@@ -0,0 +1,193 @@
+from .bitboard import (ANYWHERE, POSITION_INDEX, POSITION_LIST, SYMBOLS, BitBoard, cell_for_square,
+                       square_for_cell)
+from .winlines import O, X
+
+# This class represents the individual square of a game board. Because this is a game of ultimate tic tac toe,
+# the square can be a board itself.
+
+class GameSquare:
+    POSITION_LIST = ['UL', 'UM', 'UR',  # Possible options for position: U = Upper, M = middle, B = bottom,
+                     'ML', 'MM', 'MR',  # L = left, R = right
+                     'BL', 'BM', 'BR']
+    OWNER_LIST = ['X', 'O']  # Potentially redundant list of possible owners
+
+    def __init__(self, position, game_board, is_board=False):
+        self.taken = False  # Has this space been taken?
+        self.owner = None  # Who owns this space?
+        self.game_board = game_board  # In what board is this square?
+        self.is_board = is_board  # Is this space also a game board?
+        try:
+            if position in GameSquare.POSITION_LIST:
+                self.position = position
+        except NameError:
+            print('Invalid position. Uses form UM for UpperMiddle. See README for more information.')
+        if is_board:
+            self.sub_game = GameBoard(meta_game=False,
+                                      parent_square=self)  # Defaults to false/None but for here clarity
+
+
+# This class represents the game board itself. It contains methods to check if game is completed and its initial setup.
+# This class also contains general game info like player turn and current board stati. The rules are not played here:
+# the meta game keeps a BitBoard that plays every move, and the squares and boards only show its position.
+class GameBoard:
+    def __init__(self, meta_game=False, parent_square=None):
+        self.player_turn = True  # True for player turn, false for algorithm turn.
+        self.meta_game = meta_game
+        self.active_board = True  # At creation, all boards are active because they are legal moves (meta always active)
+        self.completed = False
+        self.winner = None  # probably redundant
+        self.parent_square = parent_square
+        if meta_game:
+            self.bits = BitBoard()  # the position, see BitBoard; moves are played on it and then shown by show()
+            self.squares = {'UL': GameSquare('UL', self, is_board=True),  # possibly rename to UL_Board?
+                            'UM': GameSquare('UM', self, is_board=True),
+                            'UR': GameSquare('UR', self, is_board=True),
+                            'ML': GameSquare('ML', self, is_board=True),
+                            'MM': GameSquare('MM', self, is_board=True),
+                            'MR': GameSquare('MR', self, is_board=True),
+                            'BL': GameSquare('BL', self, is_board=True),
+                            'BM': GameSquare('BM', self, is_board=True),
+                            'BR': GameSquare('BR', self, is_board=True)}
+            # the 81 squares of the sub-boards by cell index, board * 9 + square as on the BitBoard
+            self.cell_squares = [self.squares[board].sub_game.squares[square] for board in POSITION_LIST
+                                 for square in POSITION_LIST]
+        else:
+            self.squares = {'UL': GameSquare('UL', self),  # possibly redundant??
+                            'UM': GameSquare('UM', self),
+                            'UR': GameSquare('UR', self),
+                            'ML': GameSquare('ML', self),
+                            'MM': GameSquare('MM', self),
+                            'MR': GameSquare('MR', self),
+                            'BL': GameSquare('BL', self),
+                            'BM': GameSquare('BM', self),
+                            'BR': GameSquare('BR', self)}
+
+    def is_complete(self):  # Reads the win/tie conditions from the meta game's BitBoard, else return false
+        if self.meta_game:
+            bits = self.bits
+            completed, winner = bits.over, bits.winner
+        else:
+            bits = self.parent_square.game_board.bits
+            board = POSITION_INDEX[self.parent_square.position]
+            completed = bool(bits.closed >> board & 1)
+            winner = next((player for player in (X, O) if bits.won[player] >> board & 1), None)
+        if winner is not None:
+            self.winner = GameSquare.OWNER_LIST[winner]
+        return completed  # someone won or all items are taken = draw
+
+    def initial_move(self, meta_target, target):
+        if self.meta_game:
+            return self.squares[meta_target].sub_game.move(target)
+
+    def move(self, target):
+        if isinstance(target, str):
+            target = self.squares[target]
+        meta = self.parent_square.game_board
+        cell = cell_for_square(target)
+        if meta.bits.legal_mask() >> cell & 1:
+            meta.bits.make_move(cell)  # the BitBoard plays the move, the squares and boards only show it
+            meta.show((cell,))
+            #print(print_board(self.parent_square.game_board))  # for debugging
+            return self
+        else:
+            print('Error: Invalid target')  # TODO ADD ERROR CHECKING
+            return self  # not right for errors?
+
+    def show(self, cells=range(81)):  # on the meta game: shows bits on the squares of cells and on every board
+        bits = self.bits
+        for cell in cells:
+            square = self.cell_squares[cell]
+            for player in (X, O):
+                if bits.cells[player] >> cell & 1:
+                    square.owner = SYMBOLS[player]
+                    square.taken = True
+        for board, name in enumerate(POSITION_LIST):
+            big_square = self.squares[name]
+            sub_game = big_square.sub_game
+            if bits.closed >> board & 1 and not sub_game.completed:
+                sub_game.completed = big_square.taken = True
+                for player in (X, O):
+                    if bits.won[player] >> board & 1:
+                        sub_game.winner = big_square.owner = SYMBOLS[player]
+            sub_game.active_board = bits.active == ANYWHERE or bits.active == board
+            sub_game.player_turn = bits.turn == X
+        self.player_turn = bits.turn == X
+        self.completed = bits.over
+        if bits.winner is not None:
+            self.winner = SYMBOLS[bits.winner]
+
+    def game_end(self):  # TODO add this
+        print("Game Over, winner: {}".format(self.parent_square.game_board.winner))
+
+
+def get_legal_moves(state):  # steps out into meta_game board then reads the open spaces from its BitBoard
+    """ Determines legal moves """
+    current_board = state
+    if not current_board.meta_game:  # gets to meta-game board
+        current_board = current_board.parent_square.game_board
+    squares = current_board.cell_squares
+    return [squares[cell] for cell in current_board.bits.legal_moves()]  # none once the game is over
+
+
+def print_board(board):
+    """Prints visual representation of the Board"""
+    base_string = ""
+    counter1 = 0
+    counter2 = 3
+    inner_counter1 = 0
+    inner_counter2 = 3
+    POSITION_LIST = ['UL', 'UM', 'UR',  # Possible options for position: U = Upper, M = middle, B = bottom,
+                     'ML', 'MM', 'MR',  # L = left, R = right
+                     'BL', 'BM', 'BR']
+    if board.meta_game:
+        for i in range(3):
+            for j in range(3):
+                for name1 in POSITION_LIST[counter1: counter2]:
+                    for name2 in POSITION_LIST[inner_counter1: inner_counter2]:
+                        if board.squares[name1].sub_game.squares[name2].owner is not None:
+                            base_string += " " + board.squares[name1].sub_game.squares[name2].owner + " "
+                        else:
+                            base_string += " - "
+                    base_string += '|'
+                base_string += '\n'
+                inner_counter1 += 3
+                inner_counter2 += 3
+            inner_counter1 = 0
+            inner_counter2 = 3
+            base_string += ("_" * 30) + '\n'
+            counter1 += 3
+            counter2 += 3
+    else:
+        for square in board.squares.values():
+            counter1 += 1
+            if square.owner is not None:
+                base_string += " " + square.owner + " "
+            else:
+                base_string += ' - '
+            if counter1 == 3:
+                counter1 = 0
+                base_string += base_string + '\n'  # TODO ADD |
+                base_string = ''
+    return base_string
+
+def read_player_move(main_game):  # asks for a square in the active board (and the board when it can be any) until legal
+    active = main_game.bits.active
+    legal_moves = get_legal_moves(main_game)
+    while True:
+        board_name = input("Your board: ") if active == ANYWHERE else POSITION_LIST[active]
+        square_name = input("Your turn: ")
+        if board_name in POSITION_INDEX and square_name in POSITION_INDEX:
+            square = main_game.squares[board_name].sub_game.squares[square_name]
+            if square in legal_moves:
+                return square
+        print('Error: Invalid target')  # a typo or a taken square, ask again
+
+
+def replay(moves):  # (main_game, curr_pos) after playing moves, a list of cell indices starting with X's first move
+    main_game = GameBoard(meta_game=True)
+    board, square = divmod(moves[0], 9)
+    curr_pos = main_game.initial_move(POSITION_LIST[board], POSITION_LIST[square])
+    for cell in moves[1:]:
+        curr_pos = curr_pos.move(square_for_cell(main_game, cell))
+    return main_game, curr_pos
+
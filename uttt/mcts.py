@@ -0,0 +1,568 @@
+import numpy as np
+import contextlib
+import os
+import random
+import threading
+import time
+from .winlines import O, X
+from .batch_rollout import batch_rollout, to_arrays
+from .transposition import child_hash, zobrist_hash
+from .nodestore import BYTES_PER_NODE, NodeStore
+from .budget import SearchBudget
+from .selection import DEFAULT_SELECTION, UCB1
+
+# The Monte Carlo tree search over BitBoard positions, with its serial, batched and parallel backends. Every node holds
+# its own BitBoard and a move is a cell index; the GameBoard classes of game.py are only the interactive game's view.
+# Engine in engine.py drives it; the search only needs numpy and, for the 'root' backend, a process pool, so neither is
+# loaded by importing the package itself.
+
+
+class NodeStats:  # visit and result counts, shared by every node of one position when a transposition table is used
+    __slots__ = ('num_visits', 'wins', 'draws', 'losses')
+
+    def __init__(self):
+        self.num_visits = 0
+        self.wins = 0  # counted from the node's perspective, by default the player who moved into the node
+        self.draws = 0
+        self.losses = 0
+
+    def record(self, result, visits=1):  # result is 1 for a win, 0 for a draw and -1 for a loss
+        self.num_visits += visits
+        if result > 0:
+            self.wins += visits
+        elif result < 0:
+            self.losses += visits
+        else:
+            self.draws += visits
+
+    @property
+    def results(self):
+        return {1: self.wins, 0: self.draws, -1: self.losses}  # 1 corresponds to win, 0 to tie, and -1 to loss
+
+
+_NO_LOCK = contextlib.nullcontext()  # stands in for a node lock when only one thread searches the tree
+
+
+class MCTSNode:
+    created = 0  # nodes made so far, node budgets compare against this
+
+    def __init__(self, board, parent=None, parent_action=None, table=None, stats=None, copy_state=True,
+                 selection=None, perspective=None, rollout_policy=None, endgame=None, book=None):
+        self.board = board.copy() if copy_state else board  # the BitBoard of the position, owned by this node
+        self.parent = parent
+        self.parent_action = parent_action  # the cell played to get here from the parent
+        self.children = []  # more nodes to be added: every possible move from any given place
+        self.stats = stats if stats is not None else NodeStats()  # num_visits and results live here
+        self.table = table  # optional TranspositionTable, inherited by every child
+        self.key = None  # Zobrist hash of board, only computed when there is a table
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.untried_actions = self.board.legal_moves()
+        # statistics of the children by child_index, kept in step by backpropagate so selection is one argmax
+        self.child_visits = np.zeros(len(self.untried_actions))
+        self.child_values = np.zeros(len(self.untried_actions))  # summed results, wins minus losses
+        self.child_virtual = np.zeros(len(self.untried_actions))  # virtual loss of threads below each child
+        self.child_proven = np.full(len(self.untried_actions), np.nan)  # proven values of the children, NaN if unknown
+        self.child_index = None  # slot in the parent's arrays
+        if selection is None:
+            selection = parent.selection if parent is not None else DEFAULT_SELECTION
+        self.selection = selection  # SelectionPolicy used to pick children while searching
+        if parent is not None:
+            perspective = parent.perspective
+        self.perspective = perspective  # None to score every node for the player who moved into it, or a fixed X or O
+        self.mover = 1 - self.board.turn  # the player who made the move into this node
+        self.sign = 1 if (self.mover if perspective is None else perspective) == O else -1  # rewards are scored for O
+        if parent is not None:
+            rollout_policy = parent.rollout_policy
+        self.rollout_policy = rollout_policy  # picks the moves of rollouts, None for uniformly random moves
+        if parent is not None:
+            endgame = parent.endgame
+        self.endgame = endgame  # EndgameSolver that proves nodes with few cells left, None to only prove game ends
+        if parent is not None:
+            book = parent.book
+        self.book = book  # OpeningBook consulted before searching, None to always search
+        self.proven = None  # 1 if the mover is proven to win from here, -1 to lose and 0 to draw, None if not known
+        if self.board.over:
+            self.proven = 1 if self.board.winner == self.mover else 0
+        self.search_info = None  # iterations, stop_reason and elapsed_ms of the last best_action from this node
+        MCTSNode.created += 1
+        self.lock = threading.Lock()  # guards this node when several threads share the tree (tree-parallel search)
+        self.virtual_loss = 0  # losses counted for threads that are currently searching below this node
+
+    def is_terminal_node(self):  # the simulated game on this node's board is over, not just the real one
+        return self.board.over
+
+    def expand(self, stats=None):
+        action = self.untried_actions.pop(np.random.randint(0, len(self.untried_actions)))  # randomized index for pop
+        return self.add_child(action, stats)
+
+    def add_child(self, action, stats=None):  # plays action (a cell) on a copy of this node's board, adds the new node
+        shared = key = None
+        if self.table is not None:  # the same position reached by another move order shares its statistics
+            key = child_hash(self.position_key(), self.board, action)
+            shared = self.table.get(key)
+        if stats is not None:
+            start = time.perf_counter()
+            next_board = self.board.copy()
+            stats.add('copy', time.perf_counter() - start)
+        else:
+            next_board = self.board.copy()  # copies the board for the child node
+        next_board.make_move(action)
+        child_node = MCTSNode(next_board, parent=self, parent_action=action, table=self.table, stats=shared,
+                              copy_state=False)  # next_board is already a private copy
+        if key is not None:
+            child_node.key = key
+            if shared is None:
+                self.table.put(key, child_node.depth, child_node.stats)  # only the counts, every node has its board
+        self.solve_endgame(child_node)
+        return self.attach(child_node)
+
+    def solve_endgame(self, child_node):  # proves a new child with the endgame solver when few enough cells are left
+        if self.endgame is not None and child_node.proven is None:
+            value = self.endgame.solve(child_node.bitboard())
+            if value is not None:
+                child_node.proven = -value  # value is for the side to move in the child, the mover's opponent
+
+    def attach(self, child_node):  # appends child_node and gives it a slot in the child statistics arrays
+        child_node.child_index = len(self.children)
+        self.child_visits[child_node.child_index] = child_node.num_visits  # not 0 for a node shared by the table
+        self.child_values[child_node.child_index] = child_node.q()
+        if child_node.proven is not None:
+            self.child_proven[child_node.child_index] = child_node.proven
+        self.children.append(child_node)
+        return child_node
+
+    def update_proof(self):
+        """ MCTS-Solver step: this node is a proven loss for its mover if a child is a proven win for the player to
+        move, otherwise once every move is expanded and proven it gets the best of the children's values. Returns
+        whether the node is proven now """
+        proven = self.child_proven[:len(self.children)]
+        if (proven == 1).any():
+            value = -1
+        elif self.untried_actions or np.isnan(proven).any():
+            return False
+        else:
+            value = -int(proven.max())
+        self.proven = value
+        if self.parent is not None:
+            self.parent.child_proven[self.child_index] = value
+        return True
+
+    def exact_reward(self):  # the reward of a proven node, from O's point of view like a rollout's
+        return self.proven if self.mover == O else -self.proven
+
+    def position_key(self):
+        if self.key is None:
+            self.key = zobrist_hash(self.bitboard())
+        return self.key
+
+    def is_fully_expanded(self):  # IS this saying do every possible starting move?
+        return len(self.untried_actions) == 0
+
+    def rollout(
+            self):  # From the current state, entire game is simulated till there is an outcome for the game. This outcome of the game is returned
+        if self.proven is not None:  # decided positions are never played out
+            return self.exact_reward()
+        return self.bitboard().rollout(self.rollout_policy)  # 1 for an O win, -1 for an X win and 0 for a draw, is returned to backpropogate
+
+    def bitboard(self):  # the node's position, rollouts play out on it and take every move back
+        return self.board
+
+    def tree_policy(self, stats=None):  # selects down the tree with the selection policy and expands the first untried move
+        if stats is not None:
+            start = time.perf_counter()
+        current_node = self  # each node scores its children for the player to move there, so no player turn hack
+        while not current_node.is_terminal_node():
+            if not current_node.is_fully_expanded():
+                if stats is None:
+                    return current_node.expand()
+                selected, copied = time.perf_counter(), stats.seconds['copy']
+                stats.add('selection', selected - start)
+                child = current_node.expand(stats)
+                stats.add('expansion', time.perf_counter() - selected - (stats.seconds['copy'] - copied))
+                return child
+            if not current_node.children:  # no legal moves left in the simulated game
+                break
+            current_node = current_node.select_child()
+        if stats is not None:
+            stats.add('selection', time.perf_counter() - start)
+        return current_node
+
+    def select_child(self, virtual=False):  # scores every child at once with the selection policy
+        k = len(self.children)
+        visits, values, parent_visits = self.child_visits[:k], self.child_values[:k], self.n()
+        if virtual:  # in-flight searches of other threads count as visits that were lost
+            visits = visits + self.child_virtual[:k]
+            values = values - self.child_virtual[:k]
+            parent_visits += self.virtual_loss
+        scores = self.selection.scores(visits, values, parent_visits)
+        scores[~np.isnan(self.child_proven[:k])] = -np.inf  # solved subtrees are never sampled again
+        return self.children[int(np.argmax(scores))]
+
+    def run_iterations(self, n_iter):  # the serial search loop
+        for i in range(n_iter):
+            if self.proven is not None:
+                break
+            v = self.tree_policy()  # expansion
+            reward = v.rollout()  # simulation
+            v.backpropagate(reward)  # backpropagation
+            #print('Game: {}'.format(i))  # for debugging
+
+    def run_anytime(self, budget, stats=None):  # the serial search loop, stopped by a SearchBudget, returns iterations and reason
+        done = 0
+        while True:
+            reason = 'solved' if self.proven is not None else budget.check(done, MCTSNode.created, self.top_two_visits)
+            if reason is not None:
+                return done, reason
+            v = self.tree_policy(stats)  # expansion
+            if stats is None:
+                reward = v.rollout()  # simulation
+                v.backpropagate(reward)  # backpropagation
+            else:
+                start = time.perf_counter()
+                reward = v.rollout()
+                rolled = time.perf_counter()
+                v.backpropagate(reward)
+                stats.add('rollout', rolled - start)
+                stats.add('backpropagation', time.perf_counter() - rolled)
+                stats.add_rollout(v.bitboard().rollout_plies)
+            done += 1
+
+    def top_two_visits(self):  # the two highest visit counts of the children, for early stopping
+        visits = sorted((c.num_visits for c in self.children), reverse=True) + [0, 0]
+        return visits[0], visits[1]
+
+    def run_batched_iterations(self, budget, batch_size=256, stats=None):
+        """ Gathers batches of leaves and plays them out in one call to the rollout kernel. A batch is at most a
+        quarter of the iteration budget, so selection sees the results of the earlier batches """
+        done = 0
+        while True:
+            reason = 'solved' if self.proven is not None else budget.check(done, MCTSNode.created, self.top_two_visits)
+            if reason is not None:
+                return done, reason
+            size = batch_size if budget.iterations is None else min(batch_size, budget.iterations - done,
+                                                                    max(budget.iterations // 4, 1))
+            leaves = [self.virtual_descent(stats=stats) for _ in range(size)]  # virtual loss spreads out the batch
+            if stats is not None:
+                start = time.perf_counter()
+            rewards = batch_rollout(*to_arrays([leaf.bitboard() for leaf in leaves]))  # simulation of the whole batch
+            if stats is not None:
+                rolled = time.perf_counter()
+                stats.add('rollout', rolled - start, len(leaves))
+            for leaf, reward in zip(leaves, rewards):
+                leaf.backpropagate(leaf.exact_reward() if leaf.proven is not None else int(reward), virtual_loss=1)
+            if stats is not None:
+                stats.add('backpropagation', time.perf_counter() - rolled, len(leaves))
+            done += len(leaves)
+
+    def virtual_descent(self, virtual_loss=1, locked=False, stats=None):
+        """ tree_policy that leaves a virtual loss on every node of the path, so the next descent (another thread's,
+        or the next leaf of a batch) is steered towards a different branch. backpropagate with the same virtual_loss
+        takes it back. locked=True holds each node's lock while it is looked at """
+        if stats is not None:
+            start = time.perf_counter()
+        node = self
+        while True:
+            with node.lock if locked else _NO_LOCK:
+                node.virtual_loss += virtual_loss
+                if node.is_terminal_node():
+                    break
+                if not node.is_fully_expanded():
+                    if stats is not None:
+                        selected, copied = time.perf_counter(), stats.seconds['copy']
+                        stats.add('selection', selected - start)
+                    child = node.expand(stats)
+                    if stats is not None:
+                        stats.add('expansion', time.perf_counter() - selected - (stats.seconds['copy'] - copied))
+                    child.virtual_loss += virtual_loss  # nobody else can hold the new child's lock yet
+                    node.child_virtual[child.child_index] += virtual_loss
+                    return child
+                if not node.children:  # no legal moves left in the simulated game
+                    break
+                child = node.select_child(virtual=True)
+                node.child_virtual[child.child_index] += virtual_loss
+                node = child
+        if stats is not None:
+            stats.add('selection', time.perf_counter() - start)
+        return node
+
+    def tree_parallel_iteration(self, virtual_loss=1):  # one iteration on a tree shared by threads
+        leaf = self.virtual_descent(virtual_loss, locked=True)
+        with leaf.lock:
+            bits = leaf.bitboard().copy()  # the rollout runs on a private copy so threads can share the leaf
+        reward = leaf.exact_reward() if leaf.proven is not None else bits.rollout(leaf.rollout_policy)
+        leaf.backpropagate(reward, virtual_loss, locked=True)
+
+    def visit_totals_consistent(self):  # checks a finished search: every count adds up and no virtual loss is left
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.virtual_loss != 0 or node.child_virtual.any() or sum(node.results.values()) != node.num_visits:
+                return False
+            if node.table is None:  # with a table, children shared with other parents can have more visits
+                if sum(c.num_visits for c in node.children) > node.num_visits:
+                    return False
+                if any(node.child_visits[c.child_index] != c.num_visits for c in node.children):
+                    return False
+            stack.extend(node.children)
+        return True
+
+    # The best action function returns the node corresponding to the best possible move.
+    # backend picks the search: 'serial' runs every iteration here, 'root' splits them over independent trees in a
+    # process pool and merges their root children (a fixed seed gives the same move on every run), 'tree' runs
+    # worker threads on this one tree with virtual loss, 'batch' collects batch_size leaves at a time and plays
+    # them out together with the NumPy rollout kernel, and 'store' searches in a NodeStore of at most memory_budget
+    # bytes and copies its root children's counts here. By default workers > 1 means 'root'.
+    # Every backend also takes a SearchBudget (a deadline, node or memory budget, early stopping, or an event to stop
+    # on) in place of n_iter, except that the worker processes of 'root' only get its iterations and deadline.
+    # search_info then tells how many iterations ran and why the search stopped.
+    def best_action(self, n_iter=100,  # starts from 0 (so 2 layers is 3 layers deep)
+                    workers=1, seed=None, backend=None, batch_size=256, memory_budget=None, budget=None, stats=None):
+        """ Searches from this node and returns the child to play. Pass a SearchStats as stats to have the search
+        instrumented, see search_stats.py """
+        if backend is None:
+            backend = 'serial' if workers == 1 else 'root'
+        if backend not in SEARCH_BACKENDS:
+            raise ValueError('Unknown search backend {}, use one of {}'.format(backend, SEARCH_BACKENDS))
+        if budget is None:
+            budget = SearchBudget(iterations=n_iter)
+        elif backend == 'root' and budget.iterations is None and budget.time_ms is None:
+            raise ValueError('The root backend needs a budget with iterations or time_ms')
+        if backend == 'batch' and self.rollout_policy is not None:
+            raise ValueError('The batch backend only plays uniformly random rollouts')
+        if self.book is not None:
+            entry = self.book.lookup(self.position_key())
+            child = self.child_for_cell(int(entry['move'])) if entry is not None else None
+            if child is not None:  # played straight from the book
+                self.search_info = {'iterations': 0, 'stop_reason': 'book', 'elapsed_ms': 0.0}
+                if stats is not None:
+                    stats.finish(self, 'book', 0, 'book', 0.0)
+                return child
+        if seed is not None:
+            seed_search(seed)
+        if self.endgame is not None and self.endgame.applies(self.bitboard()):
+            while self.untried_actions:  # the solver takes over: every move is added, and solved as it is added
+                self.expand()
+            self.update_proof()
+        best_child = None
+        budget.start(MCTSNode.created)
+        if backend == 'root':
+            child_stats, done, reason = root_parallel_search(self.board, budget.iterations, workers, seed,
+                                                             self.rollout_policy, budget.time_ms, self.selection)
+            self.merge_child_stats(child_stats)
+        elif backend == 'tree':
+            done, reason = tree_parallel_search(self, workers, budget)
+        elif backend == 'batch':
+            done, reason = self.run_batched_iterations(budget, batch_size, stats)
+        elif backend == 'store':
+            board = self.bitboard().copy()
+            limits = [limit for limit in (memory_budget, budget.memory_bytes) if limit is not None]
+            store = NodeStore(memory_budget=min(limits) if limits else None)
+            budget.use_node_bytes(BYTES_PER_NODE)  # a memory budget holds far more store rows than MCTSNodes
+            budget.start()  # node budgets count the store's nodes
+            root = store.search(board, n_iter, rollout_policy=self.rollout_policy, budget=budget,
+                                selection=self.selection)
+            self.merge_child_stats(store.child_stats(root))
+            done, reason = store.search_info
+        else:
+            done, reason = self.run_anytime(budget, stats)
+        self.search_info = {'iterations': done, 'stop_reason': reason, 'elapsed_ms': budget.elapsed_ms()}
+        if stats is not None:
+            stats.finish(self, backend, done, reason, self.search_info['elapsed_ms'])
+        if not self.children and self.untried_actions:  # the budget ran out before the first iteration
+            self.expand()  # a legal move, unsearched
+        best_child = self.best_child(c_param=0.1)
+        #if num_layers > 0:
+         #   return best_child.best_action(simulation_n, num_layers - 1)  # recursively finds the best child for n_layers
+        #else:
+        #    return best_child
+        return best_child
+    def backpropagate(self, reward, virtual_loss=0, locked=False):
+        """ Walks from this node up to the root, recording reward (1 for an O win, -1 for an X win, 0 for a draw) at
+        every node from that node's perspective, and carries proofs up as far as they reach. The tree-parallel search
+        passes locked=True and its virtual loss, which is taken back on the way up while each node's lock is held """
+        node, child, child_result = self, None, 0
+        proving = self.proven is not None
+        while node is not None:
+            result = reward * node.sign
+            with node.lock if locked else _NO_LOCK:
+                node.stats.record(result)
+                node.virtual_loss -= virtual_loss
+                if child is not None:  # the edge to the child we came from lives in this node's arrays
+                    node.child_visits[child.child_index] += 1
+                    node.child_values[child.child_index] += child_result
+                    node.child_virtual[child.child_index] -= virtual_loss
+                if proving and node is not self:
+                    proving = node.proven is None and node.update_proof()
+            node, child, child_result = node.parent, node, result
+
+    def merge_child_stats(self, child_stats):
+        """ Adds (cell, visits, results) of another tree's root children, with results counted for the player who
+        made the child's move """
+        for cell, visits, results in child_stats:
+            child = self.child_for_cell(cell)
+            flip = child.sign * (1 if child.mover == O else -1)  # 1 unless the perspective is fixed to the other player
+            self.child_visits[child.child_index] += visits
+            for result, count in results.items():
+                if count:
+                    child.stats.record(result * flip, count)
+                    self.stats.record(result * flip * child.sign * self.sign, count)
+                    self.child_values[child.child_index] += result * flip * count
+
+    def child_for_cell(self, cell):  # the child for a move given as a cell index, added if needed, None if illegal
+        for child in self.children:
+            if child.parent_action == cell:
+                return child
+        if cell in self.untried_actions:
+            self.untried_actions.remove(cell)
+            return self.add_child(cell)
+        return None
+
+    def best_child(self,
+                   c_param=0.1, policy=None):  # this is the function that determines the best child node. Note the tweak-able parameter
+        if policy is None:
+            policy = UCB1(c=c_param, fpu=-np.inf)  # unvisited children are never picked as the move
+        k = len(self.children)
+        proven = self.child_proven[:k]
+        if (proven == 1).any():  # a proven win is played whatever the statistics say
+            return self.children[int(np.argmax(proven == 1))]
+        scores = policy.scores(self.child_visits[:k], self.child_values[:k], self.n())
+        scores[proven == 0] = 0.0  # the exact value of a draw
+        if not (proven == -1).all():
+            scores[proven == -1] = -np.inf
+        return self.children[int(np.argmax(scores))]
+
+    def advance(self, cell):  # the child after the real move cell as the new root, None if it was never expanded
+        new_root = next((child for child in self.children if child.parent_action == cell), None)
+        self.children = []  # prunes every other branch so the tree only keeps what can still be reached
+        if new_root is not None:
+            new_root.parent = None  # backpropagation now stops at the new root
+        return new_root
+
+    @property
+    def num_visits(self):
+        return self.stats.num_visits
+
+    @property
+    def results(self):
+        return self.stats.results
+
+    def n(self):  # Returns the number of times each node is visited
+        return self.num_visits
+
+        # Returns the difference of wins and losses (NOTE THAT THERE IS NO WEIGHT TO DRAWS OTHER THAN INCREASING N)
+
+    def q(self):
+        return self.stats.wins - self.stats.losses
+
+
+def seed_search(seed):  # seeds both random sources used by the search
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+
+
+_pools = {}  # process pools kept alive between moves, by worker count
+
+
+def get_pool(workers):
+    if workers not in _pools:
+        import multiprocessing  # only set up once a search runs on more than one process
+        _pools[workers] = multiprocessing.Pool(workers)
+    return _pools[workers]
+
+
+def _root_parallel_worker(job):  # searches one independent tree and returns the stats of its root children
+    board, n_iter, time_ms, seed, rollout_policy, selection = job
+    seed_search(seed)
+    root = MCTSNode(board, selection=selection, rollout_policy=rollout_policy)  # the default perspective, so the results are already for each child's mover
+    budget = SearchBudget(iterations=n_iter, time_ms=time_ms)
+    budget.start()
+    done, reason = root.run_anytime(budget)
+    return [(c.parent_action, c.num_visits, c.results) for c in root.children], done, reason
+
+
+def root_parallel_search(board, n_iter, workers, seed=None, rollout_policy=None, time_ms=None, selection=None):
+    """ Runs n_iter iterations from board split over independent trees in worker processes, or as many as fit in
+    time_ms when n_iter is None (with both, whichever ends first), picking children with selection (DEFAULT_SELECTION
+    if None).
+    Returns their root child stats, the iterations run and the stop reason of the first worker """
+    if seed is None:
+        seed = np.random.randint(2 ** 31)
+    shares = [None if n_iter is None else n_iter // workers + (i < n_iter % workers) for i in range(workers)]
+    jobs = [(board, shares[i], time_ms, seed + i, rollout_policy, selection) for i in range(workers)]
+    child_stats = []
+    done = 0
+    reasons = []
+    for stats, worker_done, reason in get_pool(workers).map(_root_parallel_worker, jobs):  # in worker order
+        child_stats.extend(stats)
+        done += worker_done
+        reasons.append(reason)
+    return child_stats, done, reasons[0]
+
+
+def tree_parallel_search(root, workers, budget, virtual_loss=1):
+    """ Runs iterations on root's tree with worker threads that all descend the same tree until the (started)
+    budget runs out, returns the number of iterations and the stop reason """
+    done = [0]
+    reasons = []
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            with lock:
+                reason = 'solved' if root.proven is not None else budget.check(done[0], MCTSNode.created,
+                                                                               root.top_two_visits)
+                if reason is not None:
+                    reasons.append(reason)
+                    return
+                done[0] += 1
+            root.tree_parallel_iteration(virtual_loss=virtual_loss)
+
+    threads = [threading.Thread(target=work) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return done[0], reasons[0]
+
+
+class Ponder:  # keeps searching a tree in a background thread while the opponent thinks
+    def __init__(self, tree, memory_bytes=None):
+        """ Starts searching tree (the root after the engine's own move) right away, until stop() or until the new
+        nodes would take more than memory_bytes """
+        self.tree = tree
+        self.stop_event = threading.Event()
+        self.budget = SearchBudget(memory_bytes=memory_bytes, stop_event=self.stop_event)
+        self.result = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        self.budget.start(MCTSNode.created)
+        self.result = self.tree.run_anytime(self.budget)
+
+    def stop(self):  # waits for the iteration in progress, so the tree is consistent once this returns
+        self.stop_event.set()
+        self.thread.join()
+        self.tree.search_info = {'iterations': self.result[0], 'stop_reason': 'ponder',
+                                 'elapsed_ms': self.budget.elapsed_ms()}
+        return self.result
+
+
+def report_root_scaling(board, n_iter=2000, max_workers=None, seed=0):
+    """ Times best_action with 1, 2, 4, ... workers from the same BitBoard and prints iterations per second """
+    max_workers = max_workers or os.cpu_count()
+    rows = []
+    workers = 1
+    while workers <= max_workers:
+        if workers > 1:
+            get_pool(workers)  # pool start-up is not part of the search time
+        start = time.perf_counter()
+        MCTSNode(board).best_action(n_iter, workers=workers, seed=seed)
+        rate = n_iter / (time.perf_counter() - start)
+        rows.append((workers, rate))
+        print('{:>3} workers: {:>9.1f} iterations/s  speedup {:.2f}x'.format(workers, rate, rate / rows[0][1]))
+        workers *= 2
+    return rows
+
+
+SEARCH_BACKENDS = ('serial', 'root', 'tree', 'batch', 'store')
@@ -0,0 +1,158 @@
+import numpy as np
+from .bitboard import O, X, random_cell
+from .selection import UCB1
+
+# Structure-of-arrays search tree. A node is an index into preallocated NumPy arrays rather than a Python object, and no
+# game state is stored: every iteration replays the moves from the root on one BitBoard and unmakes them afterwards.
+# Counts are kept from the point of view of the player who made the move into the node.
+
+NO_NODE = -1
+_FIELDS = (('visits', np.int32), ('wins', np.int32), ('losses', np.int32), ('draws', np.int32),
+           ('parent', np.int32), ('first_child', np.int32), ('next_sibling', np.int32), ('move', np.int8),
+           ('untried_low', np.uint64), ('untried_high', np.uint64))  # untried moves, cells 0-63 and 64-80
+BYTES_PER_NODE = sum(np.dtype(dtype).itemsize for name, dtype in _FIELDS)
+LOW_BITS = (1 << 64) - 1
+
+
+class NodeStore:
+    def __init__(self, capacity=1024, max_nodes=None, memory_budget=None):
+        """ Holds up to max_nodes nodes (or as many as fit in memory_budget bytes), growing the arrays by doubling """
+        if memory_budget is not None:
+            budget_nodes = memory_budget // BYTES_PER_NODE
+            max_nodes = budget_nodes if max_nodes is None else min(max_nodes, budget_nodes)
+        self.max_nodes = max_nodes
+        self.size = 0
+        self.search_info = None  # (iterations, stop reason) of the last search
+        self.capacity = 0
+        for name, dtype in _FIELDS:
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        if self.max_nodes is not None:
+            capacity = min(capacity, self.max_nodes)
+        for name, dtype in _FIELDS:
+            grown = np.empty(capacity, dtype=dtype)
+            grown[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def is_full(self):
+        return self.max_nodes is not None and self.size >= self.max_nodes
+
+    def add(self, parent, move, untried):  # appends a node and links it in front of its parent's children
+        if self.size == self.capacity:
+            self._grow(2 * self.capacity)
+        node = self.size
+        self.size += 1
+        self.visits[node] = self.wins[node] = self.losses[node] = self.draws[node] = 0
+        self.parent[node] = parent
+        self.first_child[node] = NO_NODE
+        self.move[node] = move
+        self.untried_low[node] = untried & LOW_BITS
+        self.untried_high[node] = untried >> 64
+        if parent != NO_NODE:
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+        else:
+            self.next_sibling[node] = NO_NODE
+        return node
+
+    def untried(self, node):
+        return int(self.untried_high[node]) << 64 | int(self.untried_low[node])
+
+    def pop_untried(self, node):  # removes and returns a random untried move of node
+        mask = self.untried(node)
+        cell = random_cell(mask)
+        mask &= ~(1 << cell)
+        self.untried_low[node] = mask & LOW_BITS
+        self.untried_high[node] = mask >> 64
+        return cell
+
+    def children(self, node):
+        child = int(self.first_child[node])
+        while child != NO_NODE:
+            yield child
+            child = int(self.next_sibling[child])
+
+    def best_child(self, node, selection):  # scored by a SelectionPolicy for the player choosing at node
+        if type(selection) is UCB1:  # the plain formula is quicker in a loop than through arrays
+            return self._best_ucb1_child(node, selection.c)
+        children = []
+        for child in self.children(node):
+            if self.visits[child] == 0:
+                return child
+            children.append(child)
+        visits = self.visits[children].astype(float)
+        values = (self.wins[children] - self.losses[children]).astype(float)
+        return children[int(np.argmax(selection.scores(visits, values, int(self.visits[node]))))]
+
+    def _best_ucb1_child(self, node, c_param):
+        log_n = np.log(self.visits[node])
+        best, best_weight = NO_NODE, None
+        for child in self.children(node):
+            n = int(self.visits[child])
+            if n == 0:
+                return child
+            weight = (int(self.wins[child]) - int(self.losses[child])) / n + c_param * np.sqrt(2 * log_n / n)
+            if best_weight is None or weight > best_weight:
+                best, best_weight = child, weight
+        return best
+
+    def backpropagate(self, node, mover, winner):  # mover made the move into node, winner is X, O or None (a draw)
+        mover_won = mover == winner
+        while node != NO_NODE:
+            self.visits[node] += 1
+            if winner is None:
+                self.draws[node] += 1
+            elif mover_won:
+                self.wins[node] += 1
+            else:
+                self.losses[node] += 1
+            mover_won = not mover_won  # the parent was reached by the other player's move
+            node = int(self.parent[node])
+
+    def child_stats(self, node):
+        """ (cell, visits, results) for each child of node, with results keyed like MCTSNode.results and counted for
+        the player who moved into the child: 1 for a win, 0 for a draw and -1 for a loss """
+        return [(int(self.move[child]), int(self.visits[child]),
+                 {1: int(self.wins[child]), 0: int(self.draws[child]), -1: int(self.losses[child])})
+                for child in self.children(node)]
+
+    def memory_bytes(self):
+        return self.capacity * BYTES_PER_NODE
+
+    def search(self, board, n_iter, c_param=0.1, rollout_policy=None, budget=None, selection=None):
+        """ Runs n_iter iterations from board (a BitBoard, left unchanged) with this store as the tree, returns the
+        root index. Children are picked by selection (a SelectionPolicy), or by UCB1 with c_param when it is None.
+        Once the store is full the tree stops growing and iterations roll out from the existing leaves. A started
+        SearchBudget can stop the search instead of n_iter, its node count is the store's size; search_info then
+        holds the iterations run and the stop reason """
+        selection = selection if selection is not None else UCB1(c=c_param)
+        root = self.add(NO_NODE, -1, board.legal_mask())
+        done = 0
+        while True:
+            reason = 'iterations' if budget is None and done >= n_iter else None
+            if budget is not None:
+                reason = budget.check(done, self.size)
+            if reason is not None:
+                break
+            done += 1
+            node = root
+            depth = 0
+            while not self.untried(node) and self.first_child[node] != NO_NODE:  # selection
+                node = self.best_child(node, selection)
+                board.make_move(int(self.move[node]))
+                depth += 1
+            if self.untried(node) and not self.is_full():  # expansion
+                cell = self.pop_untried(node)
+                board.make_move(cell)
+                depth += 1
+                node = self.add(node, cell, board.legal_mask())
+            reward = board.rollout(rollout_policy)  # simulation, the board is left as it was
+            winner = O if reward == 1 else X if reward == -1 else None
+            self.backpropagate(node, 1 - board.turn, winner)  # the side not to move made the last move
+            for _ in range(depth):
+                board.unmake_move()
+        self.search_info = (done, reason)
+        return root
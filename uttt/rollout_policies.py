@@ -0,0 +1,72 @@
+import random
+from .bitboard import MOVE_BOARDS, random_cell
+from .winlines import FULL_BOARD, O, WINNING_SQUARES, X
+
+# Rollout policies pick the moves of a playout on a BitBoard. choose(board, mask) gets the 81-bit mask of the legal cells
+# (never empty) and returns one of them. Everything is worked out on the bitmasks, a sub-board at a time, so a greedy
+# step costs a few table lookups per open board. No policy (None) means uniformly random moves, which BitBoard.rollout
+# picks with bitboard.random_cell like the policies' own random moves.
+#   GreedyRollout  takes a sub-board win, else blocks the opponent's, else avoids sending the opponent to a board they
+#                  can win right away, each rule optional; with probability epsilon it plays a random move instead
+
+SQUARE_REPEAT = sum(1 << (9 * b) for b in range(9))  # a 9-bit square mask times this is that square in every board
+
+
+class GreedyRollout:
+    def __init__(self, win=True, block=True, avoid=True, epsilon=0.0):
+        self.win = win
+        self.block = block
+        self.avoid = avoid
+        self.epsilon = epsilon
+
+    def choose(self, board, mask):
+        if self.epsilon and random.random() < self.epsilon:
+            return random_cell(mask)
+        player = board.turn
+        mine, theirs = board.cells[player], board.cells[1 - player]
+        if self.win or self.block:
+            wins = blocks = 0
+            for b in MOVE_BOARDS[(board.active + 1) << 9 | board.closed]:
+                shift = 9 * b
+                free = mask >> shift & FULL_BOARD
+                if self.win:
+                    wins |= (WINNING_SQUARES[mine >> shift & FULL_BOARD] & free) << shift
+                if self.block:
+                    blocks |= (WINNING_SQUARES[theirs >> shift & FULL_BOARD] & free) << shift
+            if wins:
+                return random_cell(wins)
+            if blocks:
+                return random_cell(blocks)
+        if self.avoid:
+            safe = mask & ~(self.threat_squares(board, theirs) * SQUARE_REPEAT)
+            if safe:
+                return random_cell(safe)
+        return random_cell(mask)
+
+    @staticmethod
+    def threat_squares(board, theirs):
+        """ 9-bit mask of the squares that send the opponent (owner of theirs) to a board they can win with one move:
+        such a board itself, or a closed board (which lets them play anywhere) when there is one """
+        free = ~(board.cells[X] | board.cells[O])
+        threats = 0
+        for b in range(9):
+            if not board.closed >> b & 1:
+                shift = 9 * b
+                if WINNING_SQUARES[theirs >> shift & FULL_BOARD] & free >> shift:
+                    threats |= 1 << b
+        return threats | board.closed if threats else 0
+
+
+ROLLOUT_POLICIES = ('random', 'win', 'block', 'greedy')
+
+
+def make_rollout_policy(name='random', epsilon=0.0):  # a policy by name, as engine configurations give it
+    if name == 'random':
+        return None
+    if name == 'win':
+        return GreedyRollout(block=False, avoid=False, epsilon=epsilon)
+    if name == 'block':
+        return GreedyRollout(avoid=False, epsilon=epsilon)
+    if name == 'greedy':
+        return GreedyRollout(epsilon=epsilon)
+    raise ValueError('Unknown rollout policy {}, use one of {}'.format(name, ROLLOUT_POLICIES))
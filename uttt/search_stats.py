@@ -0,0 +1,77 @@
+import json
+import time
+
+from .bitboard import cell_name
+
+# Optional instrumentation of one best_action search. Pass a SearchStats to best_action and the serial and batch loops
+# time every phase of every iteration into it; the other backends fill in everything but the phase times. Without one
+# the loops only pay an `is None` test per phase.
+#   selection      walking down the tree with the selection policy
+#   expansion      adding the new node, without copying its state
+#   copy           the deepcopy of the state for the new node
+#   rollout        playing the leaf out (the batch kernel, for the batch backend)
+#   backpropagation
+
+PHASES = ('selection', 'expansion', 'copy', 'rollout', 'backpropagation')
+
+
+class SearchStats:
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.rollouts = 0  # rollouts whose length is known
+        self.rollout_plies = 0
+        self.backend = None
+        self.iterations = 0
+        self.stop_reason = None
+        self.elapsed_ms = 0.0
+        self.tree_size = 0
+        self.max_depth = 0
+        self.root_visits = {}  # move (board and square, like 'MMUL') -> visits
+        self.root_values = {}  # move -> mean result for the player making the move
+
+    def add(self, phase, seconds, count=1):
+        self.seconds[phase] += seconds
+        self.counts[phase] += count
+
+    def add_rollout(self, plies):
+        self.rollouts += 1
+        self.rollout_plies += plies
+
+    def finish(self, root, backend, iterations, stop_reason, elapsed_ms):  # totals once the search from root is done
+        self.backend = backend
+        self.iterations = iterations
+        self.stop_reason = stop_reason
+        self.elapsed_ms = elapsed_ms
+        self.tree_size = 0
+        self.max_depth = 0
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            self.tree_size += 1
+            self.max_depth = max(self.max_depth, depth)
+            stack.extend((child, depth + 1) for child in node.children)
+        for child in root.children:
+            name = cell_name(child.parent_action)
+            self.root_visits[name] = child.num_visits
+            self.root_values[name] = child.q() / child.num_visits if child.num_visits else 0.0
+
+    def iterations_per_second(self):
+        return self.iterations / (self.elapsed_ms / 1000) if self.elapsed_ms else 0.0
+
+    def average_rollout_plies(self):
+        return self.rollout_plies / self.rollouts if self.rollouts else 0.0
+
+    def to_dict(self):
+        return {'backend': self.backend, 'iterations': self.iterations, 'stop_reason': self.stop_reason,
+                'elapsed_ms': self.elapsed_ms, 'iterations_per_second': self.iterations_per_second(),
+                'phase_ms': {phase: seconds * 1000 for phase, seconds in self.seconds.items()},
+                'phase_counts': dict(self.counts), 'tree_size': self.tree_size, 'max_depth': self.max_depth,
+                'average_rollout_plies': self.average_rollout_plies(), 'root_visits': dict(self.root_visits),
+                'root_values': dict(self.root_values)}
+
+    def write_json_line(self, stream, **extra):  # appends one JSON object per search, extra adds fields like the ply
+        record = dict(extra, time=time.time())
+        record.update(self.to_dict())
+        stream.write(json.dumps(record) + '\n')
+        stream.flush()
@@ -0,0 +1,42 @@
+import numpy as np
+
+# Child selection formulas. A node keeps its children's visit counts and summed values in NumPy arrays, so a policy
+# scores every child in one vectorized expression and the caller takes the argmax.
+# Unvisited children have no mean value, so they get a first-play-urgency (FPU) score instead: the fixed value fpu, or
+# when fpu is None the mean value of the visited children minus fpu_reduction.
+
+
+class SelectionPolicy:
+    def __init__(self, c=0.1, fpu=None, fpu_reduction=0.0):
+        self.c = c
+        self.fpu = fpu
+        self.fpu_reduction = fpu_reduction
+
+    def scores(self, visits, values, parent_visits):  # one score per child, unvisited children get the FPU score
+        visited = visits > 0
+        safe_visits = np.where(visited, visits, 1)
+        scores = self.visited_scores(safe_visits, values, parent_visits)
+        return np.where(visited, scores, self.urgency(visits, values, visited))
+
+    def urgency(self, visits, values, visited):
+        if self.fpu is not None:
+            return self.fpu
+        total = visits[visited].sum()
+        return (values[visited].sum() / total if total else 0.0) - self.fpu_reduction
+
+    def visited_scores(self, visits, values, parent_visits):
+        raise NotImplementedError
+
+
+class UCB1(SelectionPolicy):  # mean value plus c * sqrt(2 ln N / n), the formula best_child always used
+    def visited_scores(self, visits, values, parent_visits):
+        return values / visits + self.c * np.sqrt(2 * np.log(max(parent_visits, 1)) / visits)
+
+
+class PUCT(SelectionPolicy):  # mean value plus c * P * sqrt(N) / (1 + n) with a uniform prior P over the children
+    def visited_scores(self, visits, values, parent_visits):
+        prior = 1.0 / len(visits)
+        return values / visits + self.c * prior * np.sqrt(parent_visits) / (1 + visits)
+
+
+DEFAULT_SELECTION = UCB1(c=0.1)
@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from .bitboard import BitBoard, cell_from_name, cell_name
+from .budget import SearchBudget
+from .engine import Engine
+
+# Game server: many games at once over a local TCP or Unix socket, with the engine moves worked out by a bounded pool of
+# worker processes. The protocol is one JSON object per line each way; moves are named board then square, like 'MMUL'.
+# The client plays X and the engine answers every move as O.
+#   {"op": "new"}                                          -> {"session": 1, "legal": [...], "over": false}
+#   {"op": "move", "session": 1, "move": "MMUL", "time_ms": 200}
+#       -> {"session": 1, "move": "ULMM", "legal": [...], "over": false, "winner": null, "queue_ms": .., "search_ms": ..}
+#   {"op": "close", "session": 1}                          -> {"session": 1, "closed": true}
+# A move's time_ms is clamped to the server's [min_time_ms, max_time_ms], and one that isn't a finite number is an error.
+# Anything wrong gets {"error": "..."}, and {"error": "busy"} when max_queue engine requests are already waiting; that
+# request is dropped and can be sent again. A client that disconnects has its sessions dropped, and an engine search it
+# was waiting for is stopped through a shared flag that the worker's search budget checks.
+#   python -m uttt.server serve --port 8765 --workers 4
+#   python -m uttt.server load --port 8765 --clients 32 --games 4
+
+_stop_flags = None  # one flag per pool slot, set in every worker by _init_worker
+
+
+class _SlotFlag:  # stands in for SearchBudget's stop_event
+    def __init__(self, slot):
+        self.slot = slot
+
+    def is_set(self):
+        return _stop_flags[self.slot] != 0
+
+
+def _init_worker(flags):
+    global _stop_flags
+    _stop_flags = flags
+
+
+def _engine_move(moves, time_ms, iterations, slot):  # runs in a worker: the engine's reply to moves, as a cell
+    budget = SearchBudget(iterations=iterations, time_ms=time_ms, stop_event=_SlotFlag(slot))
+    cell, stats = Engine().search(moves, budget)
+    return cell
+
+
+class Session:
+    def __init__(self):
+        self.moves = []
+        self.board = BitBoard()  # the position, for move checks without the GameBoard classes
+
+    def play(self, cell):
+        self.board.make_move(cell)
+        self.moves.append(cell)
+
+    def state(self):
+        board = self.board
+        winner = None if board.winner is None else 'XO'[board.winner]
+        return {'legal': [cell_name(cell) for cell in board.legal_moves()], 'over': board.over, 'winner': winner}
+
+
+class Busy(Exception):
+    pass
+
+
+class GameServer:
+    def __init__(self, workers=None, max_queue=64, time_ms=200, max_time_ms=5000, iterations=1000000,
+                 min_time_ms=10):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_queue = max_queue
+        self.time_ms = time_ms  # budget of a move request that doesn't give one
+        self.min_time_ms = min_time_ms  # a move request's time_ms is clamped to [min_time_ms, max_time_ms]
+        self.max_time_ms = max_time_ms
+        self.iterations = iterations  # iteration cap on top of the time budget
+        self.flags = multiprocessing.Array('b', self.workers, lock=False)
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                           initargs=(self.flags,))
+        self.free_slots = None
+        self.waiting = 0
+        self.session_ids = itertools.count(1)
+        self.served = self.rejected = self.cancelled = 0
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None):
+        self.free_slots = asyncio.Queue()
+        for slot in range(self.workers):
+            self.free_slots.put_nowait(slot)
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):  # one connection, its requests are answered in order
+        sessions = {}
+        line = asyncio.ensure_future(reader.readline())
+        try:
+            while True:
+                data = await line
+                if not data:
+                    return
+                line = asyncio.ensure_future(reader.readline())  # watches for a disconnect during the search
+                writer.write((json.dumps(await self.respond(data, sessions, line)) + '\n').encode())
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        except ConnectionError:
+            pass
+        finally:
+            line.cancel()
+            writer.close()
+
+    async def respond(self, data, sessions, line):
+        try:
+            request = json.loads(data)
+            if not isinstance(request, dict):
+                return {'error': 'bad request: not a JSON object'}
+            op = request.get('op')
+            if op == 'new':
+                session_id = next(self.session_ids)
+                sessions[session_id] = Session()
+                return dict(sessions[session_id].state(), session=session_id)
+            session_id = request.get('session')
+            if session_id not in sessions:
+                return {'error': 'unknown session {}'.format(session_id)}
+            if op == 'close':
+                del sessions[session_id]
+                return {'session': session_id, 'closed': True}
+            if op != 'move':
+                return {'error': 'unknown op {}'.format(op)}
+            return await self.move(session_id, sessions[session_id], request, line)
+        except Busy:
+            self.rejected += 1
+            return {'error': 'busy'}
+        except (ValueError, KeyError, TypeError) as e:
+            return {'error': 'bad request: {}'.format(e)}
+
+    async def move(self, session_id, session, request, line):
+        cell = cell_from_name(request['move'])
+        if session.board.over or not session.board.legal_mask() >> cell & 1:
+            return {'error': 'illegal move {}'.format(request['move'])}
+        time_ms = self.move_time(request)
+        moves = session.moves + [cell]
+        response = {'session': session_id}
+        if not _board_over(moves):
+            start = time.perf_counter()
+            search = asyncio.ensure_future(self.engine_move(moves, time_ms))
+            await asyncio.wait({search, line}, return_when=asyncio.FIRST_COMPLETED)
+            if not search.done() and line.done() and not line.result():  # the client went away
+                search.cancel()
+                raise asyncio.CancelledError()
+            reply, queue_ms = await search
+            response.update(move=cell_name(reply), queue_ms=queue_ms,
+                            search_ms=(time.perf_counter() - start) * 1000 - queue_ms)
+        session.play(cell)
+        if 'move' in response:
+            session.play(reply)
+        self.served += 1
+        response.update(session.state())
+        return response
+
+    def move_time(self, request):  # the search time of a move request in ms
+        time_ms = float(request.get('time_ms', self.time_ms))
+        if not math.isfinite(time_ms):
+            raise ValueError('time_ms must be a finite number of milliseconds')
+        return min(max(time_ms, self.min_time_ms), self.max_time_ms)
+
+    async def engine_move(self, moves, time_ms):  # (reply cell, ms spent waiting for a worker)
+        if self.waiting >= self.max_queue:
+            raise Busy()
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            slot = await self.free_slots.get()
+        finally:
+            self.waiting -= 1
+        queue_ms = (time.perf_counter() - start) * 1000
+        self.flags[slot] = 0
+        loop = asyncio.get_running_loop()
+        future = self.pool.submit(_engine_move, moves, time_ms, self.iterations, slot)
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self.free_slots.put_nowait, slot))
+        try:
+            return await asyncio.wrap_future(future), queue_ms
+        except asyncio.CancelledError:
+            self.flags[slot] = 1  # the worker's search stops at its next budget check, then the slot is free again
+            self.cancelled += 1
+            raise
+
+
+def _board_over(moves):
+    board = BitBoard()
+    for cell in moves:
+        board.make_move(cell)
+    return board.over
+
+
+async def _play(host, port, path, games, time_ms, latencies, counts):  # one load-generator client
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(request):
+        writer.write((json.dumps(request) + '\n').encode())
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    for _ in range(games):
+        state = await call({'op': 'new'})
+        session = state['session']
+        while not state['over']:
+            start = time.perf_counter()
+            reply = await call({'op': 'move', 'session': session, 'move': random.choice(state['legal']),
+                                'time_ms': time_ms})
+            if reply.get('error') == 'busy':
+                counts['busy'] += 1
+                await asyncio.sleep(0.05)
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            state = reply
+        counts['games'] += 1
+        await call({'op': 'close', 'session': session})
+    writer.close()
+
+
+async def run_load(host='127.0.0.1', port=8765, path=None, clients=16, games=2, time_ms=100):
+    """ Plays games from many clients at once with random moves, returns throughput and latency percentiles """
+    latencies = []
+    counts = {'games': 0, 'busy': 0}
+    start = time.perf_counter()
+    await asyncio.gather(*[_play(host, port, path, games, time_ms, latencies, counts) for _ in range(clients)])
+    seconds = time.perf_counter() - start
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {'clients': clients, 'games': counts['games'], 'requests': len(latencies), 'busy': counts['busy'],
+            'seconds': seconds, 'requests_per_second': len(latencies) / seconds,
+            'games_per_second': counts['games'] / seconds, 'p50_ms': float(p50), 'p90_ms': float(p90),
+            'p99_ms': float(p99), 'max_ms': float(max(latencies))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Game server and load generator')
+    parser.add_argument('mode', choices=('serve', 'load'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='path of a Unix socket to use instead of TCP')
+    parser.add_argument('--workers', type=int, default=None, help='engine processes, defaults to the number of CPUs')
+    parser.add_argument('--max-queue', type=int, default=64, help='engine requests that may wait for a worker')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--games', type=int, default=2, help='games per load client')
+    parser.add_argument('--time-ms', type=float, default=100, help='engine time per move')
+    args = parser.parse_args()
+    if args.mode == 'serve':
+        server = GameServer(args.workers, args.max_queue, args.time_ms)
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    else:
+        print(json.dumps(asyncio.run(run_load(args.host, args.port, args.unix, args.clients, args.games, args.time_ms)),
+                         indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import random
+import sys
+import threading
+from collections import OrderedDict
+
+# Zobrist hashing: every (player, cell) pair, every active board and the side to move get a fixed random 64-bit key and a
+# position hashes to the xor of the keys that apply to it. The keys come from a fixed seed, so a hash means the same
+# position in every process and on every run.
+_keys = random.Random(0x5A0B)
+CELL_KEYS = tuple(tuple(_keys.getrandbits(64) for cell in range(81)) for player in range(2))
+ACTIVE_KEYS = tuple(_keys.getrandbits(64) for active in range(10))  # indexed by active + 1, so ANYWHERE is 0
+TURN_KEY = _keys.getrandbits(64)  # included when O is to move
+
+
+def zobrist_hash(board):  # hash of a BitBoard, the closed boards follow from the cells so they need no keys
+    key = ACTIVE_KEYS[board.active + 1] ^ (TURN_KEY if board.turn else 0)
+    for player in (0, 1):
+        mask = board.cells[player]
+        while mask:
+            low = mask & -mask
+            key ^= CELL_KEYS[player][low.bit_length() - 1]
+            mask ^= low
+    return key
+
+
+def child_hash(key, board, cell):  # hash after playing cell on board (whose hash is key), updated from key
+    player, active = board.turn, board.active
+    board.make_move(cell)
+    new_active = board.active
+    board.unmake_move()
+    return key ^ CELL_KEYS[player][cell] ^ ACTIVE_KEYS[active + 1] ^ ACTIVE_KEYS[new_active + 1] ^ TURN_KEY
+
+
+class TranspositionTable:
+    POLICIES = ('lru', 'depth')
+
+    def __init__(self, max_entries=100000, policy='lru'):
+        """ Maps position hashes to shared node data (the search stores a NodeStats per position), evicting least
+        recently used entries ('lru') or, for 'depth', keeping one entry per slot and preferring the entry closest to
+        the root """
+        if policy not in TranspositionTable.POLICIES:
+            raise ValueError('Unknown eviction policy {}, use one of {}'.format(policy, TranspositionTable.POLICIES))
+        self.max_entries = max_entries
+        self.policy = policy
+        self.entries = OrderedDict()  # 'lru': hash -> (depth, value), oldest first
+        self.slots = {}  # 'depth': hash % max_entries -> (hash, depth, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()  # the tree-parallel backend expands from several threads
+
+    def get(self, key):
+        with self.lock:
+            if self.policy == 'lru':
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.entries.move_to_end(key)
+                    value = entry[1]
+                else:
+                    value = None
+            else:
+                slot = self.slots.get(key % self.max_entries)
+                value = slot[2] if slot is not None and slot[0] == key else None
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, depth, value):
+        with self.lock:
+            if self.policy == 'lru':
+                self.entries[key] = (depth, value)
+                self.entries.move_to_end(key)
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                index = key % self.max_entries
+                slot = self.slots.get(index)
+                if slot is None or slot[0] == key or depth <= slot[1]:  # replace-by-depth: shallow entries win
+                    if slot is not None and slot[0] != key:
+                        self.evictions += 1
+                    self.slots[index] = (key, depth, value)
+
+    def __len__(self):
+        return len(self.entries) if self.policy == 'lru' else len(self.slots)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def memory_bytes(self):  # size of the table: containers, keys, entry tuples and the stored values themselves
+        table = self.entries if self.policy == 'lru' else self.slots
+        size = sys.getsizeof(table)
+        for key, entry in table.items():
+            size += sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[-1])
+        return size
+
+    def report(self):
+        return {'entries': len(self), 'max_entries': self.max_entries, 'policy': self.policy, 'hits': self.hits,
+                'misses': self.misses, 'hit_rate': self.hit_rate(), 'evictions': self.evictions,
+                'memory_bytes': self.memory_bytes()}
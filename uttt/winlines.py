@@ -0,0 +1,28 @@
+# Win/draw detection shared by every board representation. A 3x3 board (a sub-board, or the meta board where each
+# cell is a whole sub-board) is described by one 9-bit cell mask per player plus a mask of the cells that are taken.
+# Bit i is the i-th position in UL, UM, UR, ML, MM, MR, BL, BM, BR order.
+
+X, O = 0, 1  # player indexes, X always moves first (0 is the player and 1 the algorithm in MCTS_Original.py)
+DRAW = 2
+
+FULL_BOARD = 0x1FF  # all nine cells of a 3x3 grid
+WIN_LINES = (0b000000111, 0b000111000, 0b111000000,  # rows
+             0b001001001, 0b010010010, 0b100100100,  # columns
+             0b100010001, 0b001010100)  # diagonals
+
+# WINS[mask] is True when the 3x3 cell mask contains a full line, so a win check is a single lookup
+WINS = tuple(any(mask & line == line for line in WIN_LINES) for mask in range(512))
+# WINNING_SQUARES[mask] is the mask of the cells that would complete a line for the owner of mask (taken or not)
+WINNING_SQUARES = tuple(sum(1 << s for s in range(9) if not mask >> s & 1 and WINS[mask | 1 << s]) for mask in range(512))
+
+
+def outcome(x_mask, o_mask, taken_mask=None):  # X, O, DRAW, or None while the board is still being played
+    if WINS[x_mask]:
+        return X
+    if WINS[o_mask]:
+        return O
+    if taken_mask is None:  # on a sub-board a cell is taken by owning it, on the meta board drawn boards count too
+        taken_mask = x_mask | o_mask
+    if taken_mask == FULL_BOARD:
+        return DRAW
+    return None